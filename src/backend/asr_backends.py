@@ -0,0 +1,199 @@
+import os
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+BACKENDS = ("whisper", "whisper-int8", "faster-whisper")
+
+
+class ASRBackend(ABC):
+    """
+    Speech recognizer used by the translators. Every backend exposes
+    transcribe() with the arguments and the result layout of
+    whisper.Whisper.transcribe (text, segments, word timestamps), so callers
+    and StreamingTranscriber work with any of them.
+
+    Attributes:
+        name (str): Model name, e.g. "small.en".
+        device (str): "cuda" or "cpu".
+        threads (int): Intra-op CPU threads used while the model runs, 0 for the default.
+    """
+
+    def __init__(self, name, device, threads=0):
+        self.name = name
+        self.device = device
+        self.threads = threads
+
+    @property
+    def multilingual(self):
+        return not self.name.endswith(".en")
+
+    @abstractmethod
+    def transcribe(self, audio, **options) -> dict:
+        """
+        Transcribes float32 mono audio at 16 kHz like whisper.Whisper.transcribe.
+        """
+
+    def mel_filters(self):
+        """
+        Returns the mel filterbank of the model as an (n_mels, 201) array, or
+        None if the backend cannot decode a precomputed spectrogram.
+        """
+        return None
+
+    def detect_language(self, audio):
+        """
+        Detects the spoken language from the first 30 seconds of audio.
+
+        Returns:
+            tuple: The most likely language code and its probability, or
+                (None, None) if the backend only reports it from transcribe().
+        """
+        return None, None
+
+
+class WhisperBackend(ASRBackend):
+    """
+    openai-whisper in full precision, fp16 on GPU and fp32 on CPU.
+
+    torch's thread count is global to the process, so it is set to threads
+    only while this model runs and restored afterwards.
+    """
+
+    def __init__(self, name, device, threads=0):
+        if device is None:
+            # Resolved here like whisper.load_model does, so fp16 follows the device the model lands on
+            import torch
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+        super().__init__(name, device, threads)
+        import whisper
+        self.model = whisper.load_model(name, device=device)
+
+    @contextmanager
+    def cpu_threads(self):
+        """
+        Runs the enclosed torch calls with the backend's thread count.
+        """
+        if not self.threads:
+            yield
+            return
+        import torch
+        previous = torch.get_num_threads()
+        torch.set_num_threads(self.threads)
+        try:
+            yield
+        finally:
+            torch.set_num_threads(previous)
+
+    def transcribe(self, audio, **options):
+        options.setdefault("fp16", self.device == "cuda")
+        with self.cpu_threads():
+            return self.model.transcribe(audio, **options)
+
+    def mel_filters(self):
+        from whisper.audio import mel_filters
+        return mel_filters("cpu", self.model.dims.n_mels).numpy()
+
+    def detect_language(self, audio):
+        import torch
+        import whisper
+        dtype = torch.float16 if self.device == "cuda" else torch.float32
+        mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), self.model.dims.n_mels)
+        with self.cpu_threads():
+            _, probs = whisper.detect_language(self.model, mel.to(self.model.device, dtype))
+        language = max(probs, key=probs.get)
+        return language, probs[language]
+
+
+class QuantizedWhisperBackend(WhisperBackend):
+    """
+    openai-whisper on CPU with every linear layer dynamically quantized to
+    int8. Attention and MLP matrix products dominate Whisper's CPU time, so
+    this roughly halves decoding time and quarters the weight memory, at a
+    small accuracy cost.
+    """
+
+    def __init__(self, name, device="cpu", threads=0):
+        super().__init__(name, "cpu", threads)
+        import torch
+        import whisper.model
+
+        # Whisper's Linear only adds a dtype cast in forward(); turned back into
+        # a plain nn.Linear it is picked up by the default int8 mapping.
+        for module in self.model.modules():
+            if type(module) is whisper.model.Linear:
+                module.__class__ = torch.nn.Linear
+        self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    def transcribe(self, audio, **options):
+        options["fp16"] = False
+        with self.cpu_threads():
+            return self.model.transcribe(audio, **options)
+
+
+class FasterWhisperBackend(ASRBackend):
+    """
+    faster-whisper, which runs Whisper on the CTranslate2 engine with int8
+    weights on CPU (int8_float16 on GPU). Needs the optional faster-whisper
+    package.
+    """
+
+    def __init__(self, name, device, compute_type=None, threads=0):
+        if device is None:
+            import ctranslate2
+            device = "cuda" if ctranslate2.get_cuda_device_count() else "cpu"
+        super().__init__(name, device, threads)
+        from faster_whisper import WhisperModel
+        compute_type = compute_type or ("int8_float16" if device == "cuda" else "int8")
+        self.model = WhisperModel(name, device=device, compute_type=compute_type, cpu_threads=threads or 0)
+
+    def transcribe(self, audio, **options):
+        options.pop("fp16", None)
+        options.pop("verbose", None)
+        options.setdefault("beam_size", 1)  # Greedy decoding, like whisper.transcribe by default
+        segments, info = self.model.transcribe(audio, **options)
+        result_segments = []
+        for segment in segments:
+            words = [{"word": word.word, "start": word.start, "end": word.end, "probability": word.probability}
+                     for word in (segment.words or [])]
+            result_segments.append({
+                "id": segment.id,
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text,
+                "avg_logprob": segment.avg_logprob,
+                "no_speech_prob": segment.no_speech_prob,
+                "words": words
+            })
+        return {
+            "text": ''.join(segment["text"] for segment in result_segments),
+            "segments": result_segments,
+            "language": info.language,
+            "language_probability": info.language_probability
+        }
+
+
+def load_backend(name, backend=None, device=None, threads=None, compute_type=None):
+    """
+    Loads a speech recognizer.
+
+    Args:
+        name (str): Whisper model name, e.g. "small.en".
+        backend (str): One of BACKENDS; defaults to ASR_BACKEND or "whisper".
+        device (str): "cuda" or "cpu".
+        threads (int): Intra-op CPU threads; defaults to ASR_THREADS, 0 keeps the default.
+        compute_type (str): CTranslate2 compute type for faster-whisper; defaults to ASR_COMPUTE_TYPE.
+
+    Returns:
+        ASRBackend: The loaded backend.
+    """
+    backend = backend or os.getenv("ASR_BACKEND", "whisper")
+    threads = threads if threads is not None else int(os.getenv("ASR_THREADS", "0"))
+    compute_type = compute_type or os.getenv("ASR_COMPUTE_TYPE")
+
+    if backend == "whisper":
+        return WhisperBackend(name, device, threads=threads)
+    if backend == "whisper-int8":
+        return QuantizedWhisperBackend(name, threads=threads)
+    if backend == "faster-whisper":
+        return FasterWhisperBackend(name, device, compute_type=compute_type, threads=threads)
+    raise ValueError(f"Unknown ASR backend '{backend}', expected one of {', '.join(BACKENDS)}")
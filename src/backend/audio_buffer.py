@@ -0,0 +1,113 @@
+import threading
+import numpy as np
+
+
+class AudioRingBuffer:
+    """
+    AudioRingBuffer is a fixed-size float32 buffer between the audio capture
+    callback and the ASR loop.
+
+    Samples are converted from 16-bit PCM straight into preallocated storage,
+    so capturing does not allocate. The storage is mirrored (every sample is
+    written twice, capacity samples apart), which means any run of up to
+    capacity unread samples is one contiguous slice: read() returns a view
+    into the buffer, never a copy. The reader blocks on a condition variable
+    and wakes as soon as audio is written.
+
+    A view stays valid until capacity more samples have been written, so the
+    consumer must use or copy it before then. If the consumer falls behind by
+    more than capacity samples, the oldest unread audio is dropped.
+
+    Attributes:
+        sample_rate (int): Sample rate of the audio, in Hz.
+        capacity (int): Number of samples the buffer holds.
+        written (int): Total samples written.
+        read_position (int): Total samples consumed.
+        dropped (int): Samples overwritten before they were read.
+        closed (bool): Whether close() was called.
+    """
+
+    def __init__(self, seconds=30.0, sample_rate=16000):
+        """
+        Initializes the AudioRingBuffer with the given parameters.
+        """
+        self.sample_rate = sample_rate
+        self.capacity = int(seconds * sample_rate)
+        self.storage = np.zeros(2 * self.capacity, dtype=np.float32)
+        self.written = 0
+        self.read_position = 0
+        self.dropped = 0
+        self.closed = False
+        self.condition = threading.Condition()
+
+    @property
+    def available(self):
+        return self.written - self.read_position
+
+    def write_pcm16(self, data: bytes):
+        """
+        Converts 16-bit PCM bytes into the buffer and wakes the reader.
+
+        Args:
+            data (bytes): Little-endian int16 mono samples.
+        """
+        self.write(np.frombuffer(data, dtype=np.int16), scale=1 / 32768.0)
+
+    def write(self, samples, scale=1.0):
+        """
+        Writes samples into the buffer and wakes the reader.
+
+        Args:
+            samples (np.ndarray): Mono samples of any numeric dtype.
+            scale (float): Factor applied while copying, e.g. to normalize int16.
+        """
+        if not len(samples):
+            return
+        with self.condition:
+            # Anything beyond capacity would be overwritten anyway; only the newest part is copied.
+            skipped = max(0, len(samples) - self.capacity)
+            samples = samples[skipped:]
+            count = len(samples)
+            self.written += skipped
+            start = self.written % self.capacity
+            first = min(count, self.capacity - start)
+            # Both halves of the mirror receive the samples; the conversion writes in place.
+            for offset in (start, start + self.capacity):
+                np.multiply(samples[:first], scale, out=self.storage[offset:offset + first], casting='unsafe')
+            if first < count:
+                rest = count - first
+                for offset in (0, self.capacity):
+                    np.multiply(samples[first:], scale, out=self.storage[offset:offset + rest], casting='unsafe')
+            self.written += count
+            if self.available > self.capacity:
+                self.dropped += self.available - self.capacity
+                self.read_position = self.written - self.capacity
+            self.condition.notify_all()
+
+    def read(self, timeout=None):
+        """
+        Waits for audio and returns every unread sample as a view into the buffer.
+
+        Args:
+            timeout (float): Seconds to wait; None waits until audio arrives.
+
+        Returns:
+            np.ndarray: Unread float32 samples, or None if nothing arrived in time.
+        """
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.available > 0 or self.closed, timeout=timeout):
+                return None
+            count = self.available
+            if not count:
+                return None
+            start = self.read_position % self.capacity
+            self.read_position = self.written
+            return self.storage[start:start + count]
+
+    def close(self):
+        """
+        Wakes any waiting reader; reads after this return what is left, then None.
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
@@ -0,0 +1,102 @@
+import numpy as np
+
+try:
+    import soxr
+except ImportError:  # Optional: linear interpolation is used instead
+    soxr = None
+
+
+class LinearResampler:
+    """
+    Stateful linear-interpolation resampler with the resample_chunk()
+    interface of soxr.ResampleStream, used when soxr is not installed. It has
+    no anti-aliasing filter, so prefer soxr when capturing above 16 kHz.
+    """
+
+    def __init__(self, input_rate, output_rate):
+        self.step = input_rate / output_rate
+        self.position = 0.0  # Of the next output sample, relative to the pending input
+        self.pending = np.zeros(0, dtype=np.float32)
+
+    def resample_chunk(self, samples, last=False):
+        samples = np.concatenate([self.pending, samples])
+        if len(samples) < 2:
+            self.pending = samples
+            return np.zeros(0, dtype=np.float32)
+        positions = np.arange(self.position, len(samples) - 1, self.step)
+        output = np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+        self.position += len(positions) * self.step - (len(samples) - 1)
+        self.pending = samples[-1:]
+        return output
+
+
+class CaptureConverter:
+    """
+    CaptureConverter turns the raw int16 buffers of a capture callback into
+    the float32 mono 16 kHz audio Whisper expects.
+
+    Devices are captured at their native rate and channel count, because
+    loopback devices and many headsets refuse to open at 16 kHz mono.
+    Interleaved channels are averaged with one vectorized pass over the
+    buffer, and the result goes through a streaming resampler that keeps its
+    filter state between callbacks, so chunk boundaries leave no clicks or
+    gaps. Mono 16 kHz input is written to the buffer as is.
+
+    Attributes:
+        channels (int): Interleaved channels in the captured buffers.
+        input_rate (int): Capture sample rate, in Hz.
+        output_rate (int): Sample rate delivered to the audio buffer, in Hz.
+        resampler: soxr.ResampleStream, LinearResampler without soxr, or None at the output rate.
+    """
+
+    def __init__(self, channels=1, input_rate=16000, output_rate=16000, quality="HQ"):
+        """
+        Initializes the CaptureConverter; quality is a soxr quality recipe.
+        """
+        self.channels = channels
+        self.input_rate = int(input_rate)
+        self.output_rate = output_rate
+        if self.input_rate == output_rate:
+            self.resampler = None
+        elif soxr is not None:
+            self.resampler = soxr.ResampleStream(self.input_rate, output_rate, 1, dtype="float32", quality=quality)
+        else:
+            self.resampler = LinearResampler(self.input_rate, output_rate)
+
+    @property
+    def passthrough(self):
+        return self.channels == 1 and self.resampler is None
+
+    def convert(self, data: bytes) -> np.ndarray:
+        """
+        Downmixes and resamples one captured buffer.
+
+        Args:
+            data (bytes): Little-endian int16 samples, interleaved by channel.
+
+        Returns:
+            np.ndarray: Float32 mono samples in [-1, 1] at ``output_rate``.
+        """
+        frames = np.frombuffer(data, dtype=np.int16).reshape(-1, self.channels)
+        mono = frames.mean(axis=1, dtype=np.float32) if self.channels > 1 else frames[:, 0].astype(np.float32)
+        mono *= 1 / 32768.0
+        if self.resampler is None:
+            return mono
+        return self.resampler.resample_chunk(mono)
+
+    def write(self, data: bytes, buffer):
+        """
+        Converts one captured buffer into the AudioRingBuffer.
+        """
+        if self.passthrough:
+            buffer.write_pcm16(data)
+        else:
+            buffer.write(self.convert(data))
+
+    def flush(self) -> np.ndarray:
+        """
+        Returns the samples still held back by the resampler at the end of capture.
+        """
+        if self.resampler is None:
+            return np.zeros(0, dtype=np.float32)
+        return self.resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
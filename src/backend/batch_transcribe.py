@@ -0,0 +1,206 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from translation import TranslationCoalescer
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".m4a", ".flac", ".ogg", ".opus", ".webm", ".mp4", ".mkv")
+SAMPLE_RATE = 16000
+
+_worker_model = None
+
+
+def find_recordings(inputs):
+    """
+    Expands files and directories (searched recursively) into a sorted list of
+    audio files, each with the name of its transcript.
+
+    The name is the path relative to the directory it was found in, extension
+    included, so a/meeting.wav, b/meeting.wav and meeting.mp3 get different
+    transcripts. Names that still clash get a numbered suffix.
+
+    Returns:
+        list: (path, transcript name) pairs.
+    """
+    found = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                found.extend((os.path.join(root, name), os.path.relpath(os.path.join(root, name), item))
+                             for name in files if name.lower().endswith(AUDIO_EXTENSIONS))
+        else:
+            found.append((item, os.path.basename(item)))
+
+    recordings = []
+    used = set()
+    for path, relative in sorted(found):
+        name = f"{relative}.txt"
+        number = 2
+        while name in used:
+            name = f"{relative}-{number}.txt"
+            number += 1
+        used.add(name)
+        recordings.append((path, name))
+    return recordings
+
+
+def init_worker(model, asr_backend, threads):
+    """
+    Loads the speech recognizer once in every worker process.
+    """
+    global _worker_model
+    from model_registry import get_asr_backend
+    _worker_model = get_asr_backend(model, backend=asr_backend, threads=threads)
+
+
+def transcribe_file(path, language=None):
+    """
+    Transcribes a whole recording with Whisper's long-form path, which slides
+    a 30 second window over the file and conditions each window on the text
+    before it. Runs in a worker process.
+
+    Args:
+        path (str): Audio file in any format ffmpeg can read.
+        language (str): Spoken language code, or None to detect it.
+
+    Returns:
+        dict: The file, its duration, the compute time, the language and its
+            (start, end, text) segments.
+    """
+    import whisper
+    audio = whisper.load_audio(path, sr=SAMPLE_RATE)
+    start = time.perf_counter()
+    result = _worker_model.transcribe(audio, language=language)
+    return {
+        "path": path,
+        "duration": len(audio) / SAMPLE_RATE,
+        "compute_seconds": time.perf_counter() - start,
+        "language": result.get("language"),
+        "segments": [(segment["start"], segment["end"], segment["text"].strip())
+                     for segment in result["segments"] if segment["text"].strip()]
+    }
+
+
+def format_timestamp(seconds):
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{seconds:06.3f}"
+
+
+def write_transcript(result, translations, output_dir, name):
+    """
+    Writes the timestamped transcript of a file, each segment followed by its translation.
+
+    Args:
+        name (str): Transcript name from find_recordings, relative to output_dir.
+
+    Returns:
+        str: Path of the transcript.
+    """
+    path = os.path.join(output_dir, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for index, (start, end, text) in enumerate(result["segments"]):
+            f.write(f"[{format_timestamp(start)} --> {format_timestamp(end)}] {text}\n")
+            if translations:
+                f.write(f"    {translations[index]}\n")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcribe and translate recorded meetings offline.")
+    parser.add_argument("inputs", nargs="+", help="Audio files or directories of recordings")
+    parser.add_argument("--output-dir", default="transcripts", help="Where the transcripts are written")
+    parser.add_argument("--model", default="small", help="Whisper model name")
+    parser.add_argument("--asr-backend", choices=["whisper", "whisper-int8", "faster-whisper"],
+                        help="Speech recognizer; defaults to ASR_BACKEND or whisper")
+    parser.add_argument("--language", help="Spoken language code; detected per file by default")
+    parser.add_argument("--translate-to", help="Also translate every segment into this language, e.g. Spanish")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 1) // 4),
+                        help="Worker processes, each with its own model")
+    parser.add_argument("--threads", type=int, help="CPU threads per worker; defaults to cores / workers")
+    parser.add_argument("--batch-size", type=int, default=16, help="Segments per translation request")
+    parser.add_argument("--concurrency", type=int, default=4, help="Translation requests in flight")
+    parser.add_argument("--json", help="Write the throughput report to this JSON file.")
+    args = parser.parse_args()
+
+    recordings = find_recordings(args.inputs)
+    names = dict(recordings)
+    if not recordings:
+        parser.error("no recordings found")
+    os.makedirs(args.output_dir, exist_ok=True)
+    threads = args.threads or max(1, (os.cpu_count() or 1) // args.workers)
+    translator = None
+    if args.translate_to:
+        translator = TranslationCoalescer(output_language=args.translate_to, prompt="translation",
+                                          max_batch=args.batch_size, concurrency=args.concurrency)
+
+    start = time.perf_counter()
+    files = []
+    failed = []
+    untranslated = []
+    print(f"Transcribing {len(recordings)} recordings with {args.workers} workers of {threads} threads")
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker,
+                             initargs=(args.model, args.asr_backend, threads)) as pool:
+        futures = {pool.submit(transcribe_file, path, args.language): path for path, _ in recordings}
+        # Files are translated and written as they finish, while the workers go on with the rest.
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                failed.append(futures[future])
+                print(f"{futures[future]}: failed: {e}")
+                continue
+            translations = None
+            if translator is not None:
+                texts = [text for _, _, text in result["segments"]]
+                try:
+                    translations = [pending.result() for pending in translator.submit_many(texts)]
+                except Exception as e:
+                    # The transcript is still written, without translations
+                    untranslated.append(result["path"])
+                    print(f"{result['path']}: translation failed, writing it untranslated: {e}")
+            output = write_transcript(result, translations, args.output_dir, names[result["path"]])
+            files.append({
+                "file": result["path"],
+                "transcript": output,
+                "language": result["language"],
+                "audio_seconds": result["duration"],
+                "compute_seconds": result["compute_seconds"],
+                "segments": len(result["segments"])
+            })
+            print(f"{output}: {result['duration'] / 60:.1f} min of audio, {len(result['segments'])} segments, "
+                  f"real-time factor {result['compute_seconds'] / max(result['duration'], 1e-9):.3f}")
+
+    if translator is not None:
+        translator.close()
+    wall = time.perf_counter() - start
+    audio = sum(item["audio_seconds"] for item in files)
+    report = {
+        "settings": vars(args),
+        "files": files,
+        "failed": failed,
+        "untranslated": untranslated,
+        "audio_seconds": audio,
+        "wall_seconds": wall,
+        "speed": audio / wall if wall else None,
+        "segments": sum(item["segments"] for item in files),
+        "translation_requests": translator.requests if translator else 0
+    }
+    print(f"\n{len(files)} recordings, {audio / 3600:.2f} h of audio in {wall / 60:.1f} min "
+          f"({report['speed']:.1f}x real time), {report['segments']} segments")
+    if translator is not None:
+        print(f"Translated into {args.translate_to} with {translator.requests} requests")
+    if failed:
+        print(f"{len(failed)} recordings failed")
+    if untranslated:
+        print(f"{len(untranslated)} recordings written without translation")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,18 @@
-import os
+import time
 import numpy as np
 import speech_recognition as sr
-import whisper
-import torch
-from queue import Queue
-from datetime import datetime, timedelta
-from time import sleep
 from sys import platform
 import pyaudio
-from translation import text_transcript
+from translation import TranslationCoalescer
+from streaming_asr import StreamingTranscriber
+from decoding_state import DecodingSession
+from vad import VoiceActivityDetector
+from audio_buffer import AudioRingBuffer
+from audio_capture import CaptureConverter
+from pipeline import Pipeline, PipelineStage
+from model_registry import registry, get_asr_backend
+from transcript_display import TranscriptFeed, TerminalDisplay
+from metrics import metrics
 
 class RealTimeTranscript:
     """
@@ -19,17 +23,34 @@ class RealTimeTranscript:
         model_name (str): Whisper model to be used.
         energy_threshold (int): Energy threshold for speech recognition.
         record_timeout (int): Timeout duration for recording.
-        phrase_timeout (int): Timeout duration for detecting phrase end.
+        phrase_timeout (int): Seconds below the energy threshold that end a phrase when the VAD is off.
+        max_phrase (float): Seconds after which a phrase is closed when the VAD is off.
         speaker_device_index (int): Speaker device index for audio input.
-        phrase_time (datetime): Time of the last detected phrase.
-        data_queue (Queue): Queue to store audio data.
+        stream (Stream): Non-blocking capture stream at the device's native rate and channels.
+        converter (CaptureConverter): Downmixes and resamples captured buffers to 16 kHz mono.
+        streaming (bool): Whether to decode phrases incrementally with a rolling window.
+        asr_backend (str): Speech recognizer: "whisper", "whisper-int8" or "faster-whisper"; None uses ASR_BACKEND.
+        asr_threads (int): Intra-op CPU threads for the recognizer; None uses ASR_THREADS.
+        vad (VoiceActivityDetector): Speech gate in front of Whisper, or None to split phrases on silence.
+        silence (float): Seconds below the energy threshold at the end of the current phrase.
+        phrase_samples (int): Samples in the current phrase when the VAD is off.
+        audio_buffer (AudioRingBuffer): Captured samples waiting for transcription.
+        running (bool): Whether run() keeps waiting for audio.
+        last_capture (float): time.perf_counter() of the latest captured chunk.
+        phrase_audio (list): Audio pieces of the current phrase.
         transcription (list): List to store transcriptions.
+        feed (TranscriptFeed): Changed transcription lines, for the display.
+        display (TerminalDisplay): Redraws only the lines that changed.
         recorder (Recognizer): Speech recognition instance.
-        audio_model (WhisperModel): Whisper model for speech-to-text.
+        audio_model (ASRBackend): Speech recognizer for speech-to-text.
+        session (DecodingSession): Language and prompt context carried across phrases.
+        streamer (StreamingTranscriber): Incremental decoder used in streaming mode.
         p (PyAudio): PyAudio instance for handling audio input.
+        translator (TranslationCoalescer): Translates queued phrases, several per request when they pile up.
+        pipeline (Pipeline): Translation stage running alongside transcription.
     """
 
-    def __init__(self, model="tiny", energy_threshold=1000, record_timeout=3, phrase_timeout=3):
+    def __init__(self, model="tiny", energy_threshold=1000, record_timeout=3, phrase_timeout=3, max_phrase=25.0, streaming=False, use_vad=True, queue_size=4, asr_backend=None, asr_threads=None):
         """
         Initializes the RealTimeTranscript with the given parameters.
         """
@@ -37,20 +58,39 @@ class RealTimeTranscript:
         self.energy_threshold = energy_threshold
         self.record_timeout = record_timeout
         self.phrase_timeout = phrase_timeout
+        self.max_phrase = max_phrase
+        self.streaming = streaming
+        self.asr_backend = asr_backend
+        self.asr_threads = asr_threads
+        self.vad = VoiceActivityDetector() if use_vad else None
         
-        self.phrase_time = None
-        self.data_queue = Queue()
+        self.silence = 0.0
+        self.phrase_samples = 0
+        self.audio_buffer = AudioRingBuffer(sample_rate=16000)
+        self.running = False
+        self.last_capture = None
+        self.phrase_audio = []
         self.transcription = ['']
+        self.feed = TranscriptFeed()
+        self.display = TerminalDisplay(self.feed)
+        self.last_depths = None
 
         self.recorder = sr.Recognizer()
         self.recorder.energy_threshold = energy_threshold
         self.recorder.dynamic_energy_threshold = False
         
         self.p = pyaudio.PyAudio()
+        self.stream = None
+        self.converter = CaptureConverter()
         self.speaker_device_index = self.find_valid_input_device()
         self.setup_speaker()
         self.load_audio_model()
 
+        self.translator = TranslationCoalescer(output_language="Spanish", prompt="transcript")
+        self.pipeline = Pipeline([
+            PipelineStage("translation", self.translate_phrase, maxsize=queue_size)
+        ])
+
     def find_valid_input_device(self):
         """
         Finds a valid input device with channels available.
@@ -66,39 +106,49 @@ class RealTimeTranscript:
 
     def setup_speaker(self):
         """
-        Sets up the speaker for audio input.
+        Sets up the speaker for audio input. The device is opened at its native
+        rate with all of its channels and delivers audio through record_callback.
         """
         device_info = self.p.get_device_info_by_index(self.speaker_device_index)
         channels = device_info['maxInputChannels']
+        rate = int(device_info['defaultSampleRate'])
         
         if channels < 1:
             raise ValueError(f"The selected device does not support the required number of input channels: {channels}")
         
+        self.converter = CaptureConverter(channels=channels, input_rate=rate, output_rate=16000)
         self.stream = self.p.open(format=pyaudio.paInt16,
                                   channels=channels,
-                                  rate=16000,
+                                  rate=rate,
                                   input=True,
                                   input_device_index=self.speaker_device_index,
-                                  frames_per_buffer=1024)
-        print(f"Using speaker: {device_info['name']} with index {self.speaker_device_index} and channels: {channels}")
+                                  frames_per_buffer=1024,
+                                  stream_callback=self.record_callback,
+                                  start=False)
+        print(f"Using speaker: {device_info['name']} with index {self.speaker_device_index}, channels: {channels} and rate: {rate} Hz")
 
     def load_audio_model(self):
         """
-        Loads the Whisper audio model.
+        Loads the speech recognizer with the configured backend, reusing it if it is already in memory.
         """
         if self.model_name != "large":
             self.model_name += ".en"
-        self.audio_model = whisper.load_model(self.model_name)
+        self.audio_model = get_asr_backend(self.model_name, backend=self.asr_backend, threads=self.asr_threads)
+        self.session = DecodingSession(self.audio_model)
+        self.streamer = StreamingTranscriber(self.session)
 
     def record_callback(self, in_data, frame_count, time_info, status):
         """
         Callback function to handle audio data.
         
         Args:
-            in_data (bytes): The audio data.
+            in_data (bytes): Interleaved int16 audio at the device rate.
+            frame_count (int): Frames in in_data.
         """
-        self.data_queue.put(in_data)
-        return (in_data, pyaudio.paContinue)
+        self.last_capture = time.perf_counter()
+        metrics.increment("conversation_captured_audio_seconds", frame_count / self.converter.input_rate)
+        self.converter.write(in_data, self.audio_buffer)
+        return (None, pyaudio.paContinue)
 
     def start_listening(self):
         """
@@ -107,55 +157,205 @@ class RealTimeTranscript:
         self.stream.start_stream()
         print("Model loaded and listening started.\n")
 
-    def process_audio(self, audio_data):
+    @metrics.timed("conversation_process_audio_seconds")
+    def process_audio(self, audio_np):
         """
-        Processes audio data to text using Whisper model.
-        
+        Processes newly captured audio into the transcription.
+
+        The capture callback delivers audio continuously, so without the VAD a
+        phrase is closed after phrase_timeout seconds below the energy
+        threshold or once it is max_phrase seconds long. Until then the whole
+        phrase is transcribed again as it grows.
+
         Args:
-            audio_data (bytes): The audio data.
-            
+            audio_np (np.ndarray): New float32 samples, a view into the audio buffer.
+        """
+        if self.vad is not None:
+            for segment in self.vad.feed(audio_np):
+                self.handle_speech(segment)
+            return
+
+        loud = np.sqrt(np.mean(np.square(audio_np))) * 32768 >= self.energy_threshold
+        if not loud and not self.phrase_samples:
+            return  # Silence between phrases is not transcribed
+        self.silence = 0.0 if loud else self.silence + len(audio_np) / 16000
+        self.phrase_samples += len(audio_np)
+        complete = self.silence >= self.phrase_timeout or self.phrase_samples >= self.max_phrase * 16000
+
+        if self.streaming:
+            self.streamer.insert_audio(audio_np)
+            if not complete:
+                self.set_line(-1, self.streamer.process_iter())
+                return
+            text = self.streamer.finish()
+        else:
+            self.phrase_audio.append(audio_np.copy())
+            text = self.transcribe_audio(np.concatenate(self.phrase_audio))
+            if not complete:
+                self.set_line(-1, text)
+                return
+            self.phrase_audio = []
+        self.silence = 0.0
+        self.phrase_samples = 0
+        self.complete_phrase(text)
+
+    def transcribe_audio(self, audio_np):
+        """
+        Transcribes float32 audio samples using Whisper model, in the session
+        language and with the recently committed text as prompt.
+
+        Args:
+            audio_np (np.ndarray): The audio samples.
+
         Returns:
             str: Transcribed text.
         """
-        audio_np = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
-        result = self.audio_model.transcribe(audio_np, fp16=torch.cuda.is_available())
-        print(f"Transcription result: {result['text'].strip()}")
+        result = self.session.transcribe(audio_np)
         return result['text'].strip()
 
+    def handle_speech(self, segment):
+        """
+        Feeds one speech segment from the VAD into the current phrase.
+
+        Args:
+            segment (SpeechSegment): The speech piece.
+        """
+        if self.streaming:
+            self.streamer.insert_audio(segment.audio)
+            if not segment.complete:
+                self.set_line(-1, self.streamer.process_iter())
+                return
+            text = self.streamer.finish()
+        else:
+            self.phrase_audio.append(segment.audio)
+            if not segment.complete:
+                return
+            text = self.transcribe_audio(np.concatenate(self.phrase_audio))
+            self.phrase_audio = []
+        self.complete_phrase(text)
+
+    def complete_phrase(self, text):
+        """
+        Translates a finished phrase and starts a new transcription line.
+
+        Args:
+            text (str): The phrase text.
+        """
+        if not text:
+            return
+        self.session.commit(text)
+        self.set_line(-1, text)
+        self.queue_phrase(len(self.transcription) - 1, text)
+        self.transcription.append('')
+
+    def queue_phrase(self, index, text):
+        """
+        Submits a phrase for translation and starts its latency trace at the
+        moment its last audio was captured. The translation stage waits for the
+        result, so phrases that pile up behind a slow request share the next one.
+
+        Args:
+            index (int): Position of the phrase in the transcription list.
+            text (str): The phrase text.
+        """
+        metrics.begin((id(self), index), self.last_capture)
+        metrics.mark((id(self), index), "conversation_asr")
+        self.pipeline.put((index, self.translator.submit(text)))
+
+    def translate_phrase(self, phrase):
+        """
+        Translation stage: replaces a transcription line with its translation.
+
+        Args:
+            phrase (tuple): Index in the transcription list and the Future of its translation.
+        """
+        index, translation = phrase
+        self.set_line(index, translation.result())
+        metrics.mark((id(self), index), "conversation_translation")
+        metrics.finish((id(self), index), "conversation_end_to_end")
+
+    def set_line(self, index, text):
+        """
+        Replaces one transcription line and sends only that line to the display.
+
+        Args:
+            index (int): Position in the transcription list; negative values count from the end.
+            text (str): The new text of the line.
+        """
+        if index < 0:
+            index += len(self.transcription)
+        self.transcription[index] = text
+        self.feed.publish(index, text)
+
+    def queue_depths(self):
+        """
+        Returns the number of items waiting in front of each stage.
+        """
+        depths = {"asr": self.audio_buffer.available}
+        depths.update(self.pipeline.queue_depths())
+        return depths
+
+    def publish_depths(self):
+        """
+        Updates the status line below the transcript when the queue depths change.
+        """
+        depths = self.queue_depths()
+        if depths != self.last_depths:
+            self.last_depths = depths
+            self.feed.publish(None, f"Queue depths: {depths}")
+
+    def finish_audio(self):
+        """
+        Closes the phrase in progress once no more audio will arrive.
+        """
+        if self.vad is not None:
+            segment = self.vad.flush()
+            if segment is not None:
+                self.handle_speech(segment)
+        elif self.streaming:
+            self.complete_phrase(self.streamer.finish())
+        elif self.phrase_audio:
+            self.complete_phrase(self.transcribe_audio(np.concatenate(self.phrase_audio)))
+            self.phrase_audio = []
+
+    def stop(self):
+        """
+        Makes run() return once the audio already captured has been processed.
+        """
+        self.running = False
+        if self.stream is not None:
+            self.stream.stop_stream()
+        self.audio_buffer.write(self.converter.flush())
+        self.audio_buffer.close()
+
     def run(self):
         """
         Runs the real-time translator.
         """
         self.start_listening()
+        self.display.start()
+        metrics.start_server()
+        self.pipeline.start()
 
-        while True:
+        self.running = True
+        while self.running or self.audio_buffer.available:
             try:
-                now = datetime.utcnow()
-                if not self.data_queue.empty():
-                    phrase_complete = False
-                    if self.phrase_time and now - self.phrase_time > timedelta(seconds=self.phrase_timeout):
-                        phrase_complete = True
-                    self.phrase_time = now
-
-                    audio_data = b''.join(self.data_queue.queue)
-                    self.data_queue.queue.clear()
-                    text = self.process_audio(audio_data)
-
-                    if phrase_complete:
-                        translated_text = text_transcript(text=text)
-                        self.transcription.append(translated_text)
-                    else:
-                        self.transcription[-1] = text
-
-                    os.system('cls' if os.name == 'nt' else 'clear')
-                    for line in self.transcription:
-                        print(line)
-                    print('', end='', flush=True)
-                else:
-                    sleep(0.25)
+                # Wakes as soon as the capture callback writes audio; the timeout only bounds the wait
+                audio_np = self.audio_buffer.read(timeout=0.5)
+                if audio_np is None:
+                    continue
+                self.process_audio(audio_np)
+                self.publish_depths()
             except KeyboardInterrupt:
                 break
 
+        self.audio_buffer.close()
+        self.finish_audio()
+        self.pipeline.stop()
+        self.translator.close()
+        registry.release(self.audio_model)
+        self.display.stop()
+
         print("\n\nTranscription:")
         for line in self.transcription:
             print(line)
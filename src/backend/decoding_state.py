@@ -0,0 +1,211 @@
+import numpy as np
+
+from metrics import metrics
+from model_registry import registry
+from transcript_display import notify
+
+SAMPLE_RATE = 16000
+N_FFT = 400
+HOP_LENGTH = 160
+N_SAMPLES = 30 * SAMPLE_RATE  # Whisper's 30 second context
+N_FRAMES = N_SAMPLES // HOP_LENGTH
+WINDOW = np.hanning(N_FFT + 1)[:-1].astype(np.float32)  # periodic Hann, as torch.hann_window
+
+
+def stft_power(padded):
+    """
+    Power spectrum of every N_FFT frame of already padded audio, one column per frame.
+    """
+    frames = np.lib.stride_tricks.sliding_window_view(padded, N_FFT)[::HOP_LENGTH]
+    return (np.abs(np.fft.rfft(frames * WINDOW, axis=-1)) ** 2).T.astype(np.float32)
+
+
+class LogMelCache:
+    """
+    LogMelCache computes Whisper's log-mel spectrogram of an audio window that
+    keeps growing, e.g. the streaming window of a phrase that is decoded again
+    on every update. Frames whose STFT window lies entirely inside audio seen
+    before cannot change, so they are kept and only the frames of the new
+    samples (and the few near the end that overlap the padding) are computed.
+
+    It feeds the batched decoding of the session server. The translators'
+    DecodingSession cannot use it: whisper's transcribe() only accepts audio
+    and computes its own spectrogram.
+
+    Attributes:
+        filters (np.ndarray): Mel filterbank, shape (n_mels, N_FFT // 2 + 1).
+        audio (np.ndarray): The audio the cached frames belong to.
+        power (np.ndarray): Mel power of the frames that later audio cannot change.
+    """
+
+    def __init__(self, filters):
+        self.filters = filters
+        self.reset()
+
+    def reset(self):
+        self.audio = np.zeros(0, dtype=np.float32)
+        self.power = np.zeros((len(self.filters), 0), dtype=np.float32)
+
+    def extends(self, audio):
+        """
+        Whether audio starts with the cached audio, checked on its first and last hop.
+        """
+        size = len(self.audio)
+        if not size or len(audio) < size:
+            return False
+        head = min(size, HOP_LENGTH)
+        return np.array_equal(audio[:head], self.audio[:head]) and np.array_equal(audio[size - head:size], self.audio[-head:])
+
+    def log_mel(self, audio):
+        """
+        Returns the log-mel spectrogram of the first 30 seconds of audio, as
+        whisper.log_mel_spectrogram(whisper.pad_or_trim(audio)): the audio is
+        padded with silence to 30 seconds, and only the ends of those 30
+        seconds are reflected.
+
+        Args:
+            audio (np.ndarray): Float32 mono audio at 16 kHz.
+
+        Returns:
+            np.ndarray: Shape (n_mels, N_FRAMES), or None for less than one frame of audio.
+        """
+        audio = np.asarray(audio[:N_SAMPLES], dtype=np.float32)
+        if len(audio) <= N_FFT // 2:
+            return None
+        if not self.extends(audio):
+            self.reset()
+
+        # Short audio is followed by silence, so frames reaching past its end see
+        # zeros; only a full 30 second window is reflected at the end.
+        if len(audio) == N_SAMPLES:
+            end = audio[-N_FFT // 2 - 1:-1][::-1]
+        else:
+            end = np.zeros(N_FFT, dtype=np.float32)
+
+        stable = self.power.shape[1]
+        if stable < 2:
+            power = self.filters @ stft_power(np.concatenate([audio[N_FFT // 2:0:-1], audio, end]))
+        else:
+            # Frame i is centred on sample i * HOP_LENGTH; resume at the first frame not cached.
+            start = stable * HOP_LENGTH - N_FFT // 2
+            tail = np.concatenate([audio[start:], end])
+            power = np.concatenate([self.power, self.filters @ stft_power(tail)], axis=1)
+
+        self.audio = audio.copy()
+        self.power = power[:, :(len(audio) - N_FFT // 2) // HOP_LENGTH + 1]
+
+        # Frames past the computed ones only see silence; whisper drops its last frame.
+        mel = np.zeros((len(self.filters), N_FRAMES), dtype=np.float32)
+        frames = min(power.shape[1], N_FRAMES)
+        mel[:, :frames] = power[:, :frames]
+        log_spec = np.log10(np.maximum(mel, 1e-10))
+        log_spec = np.maximum(log_spec, log_spec.max() - 8.0)
+        return (log_spec + 4.0) / 4.0
+
+
+class DecodingSession:
+    """
+    DecodingSession carries decoding state from one transcribe() call to the
+    next for a single audio stream, instead of every call starting from scratch.
+
+    While the language is unknown it is detected once per call with the
+    backend's detect_language() and passed to transcribe(), so Whisper does not
+    run a second detection; backends that cannot detect it separately report
+    it with the transcription. After a confident detection it is locked and
+    detection stops. Recently committed text is passed as the initial prompt, which keeps
+    names and spelling consistent across phrases and makes Whisper less likely
+    to repeat itself or hallucinate on short chunks.
+
+    A DecodingSession can stand in for the audio model of a StreamingTranscriber;
+    the prompt the transcriber passes is appended to the session context.
+
+    Attributes:
+        audio_model (ASRBackend): Speech recognizer with Whisper's transcribe() interface.
+        language (str): Locked language code, or None while it is still detected.
+        threshold (float): Detection probability needed to lock the language.
+        agreements (int): Consecutive equal detections that lock the language when
+            the backend reports no probability.
+        prompt_chars (int): Characters of committed text kept as the prompt.
+        context (str): Recently committed text.
+    """
+
+    def __init__(self, audio_model, language=None, threshold=0.8, agreements=3, prompt_chars=200):
+        """
+        Initializes the DecodingSession; English-only models start locked to English.
+        """
+        self.audio_model = audio_model
+        self.threshold = threshold
+        self.agreements = agreements
+        self.prompt_chars = prompt_chars
+        self.initial_language = language if language or audio_model.multilingual else "en"
+        self.reset()
+
+    def reset(self):
+        """
+        Forgets the detected language and the committed text, e.g. when the speaker changes.
+        """
+        self.language = self.initial_language
+        self.context = ''
+        self.candidate = None
+        self.streak = 0
+
+    def transcribe(self, audio, **options) -> dict:
+        """
+        Transcribes audio with the session language and context.
+
+        Args:
+            audio (np.ndarray): Float32 mono audio at 16 kHz.
+            **options: Further transcribe() arguments; initial_prompt is appended to the context.
+
+        Returns:
+            dict: The transcribe() result of the audio model.
+        """
+        language = self.language or self.detect(audio)
+        if language:
+            options.setdefault("language", language)
+        prompt = f"{self.context} {options.get('initial_prompt') or ''}".strip()
+        options["initial_prompt"] = prompt[-self.prompt_chars:] or None
+        with registry.lock(self.audio_model):
+            result = self.audio_model.transcribe(audio, **options)
+        if self.language is None and not language:
+            self.observe(result.get("language"), result.get("language_probability"))
+        return result
+
+    def detect(self, audio):
+        """
+        Detects the language of audio.
+
+        Returns:
+            str: The most likely language code, or None if the backend cannot detect it.
+        """
+        if len(audio) <= N_FFT // 2:
+            return None
+        with metrics.time("asr_language_detection_seconds"), registry.lock(self.audio_model):
+            language, probability = self.audio_model.detect_language(audio)
+        self.observe(language, probability)
+        return language
+
+    def observe(self, language, probability=None):
+        """
+        Locks the language once a detection is confident enough.
+        """
+        if not language:
+            return
+        if probability is None:
+            self.streak = self.streak + 1 if language == self.candidate else 1
+            self.candidate = language
+            confident = self.streak >= self.agreements
+        else:
+            confident = probability >= self.threshold
+        if confident:
+            self.language = language
+            notify(f"Language locked to '{language}'")
+
+    def commit(self, text):
+        """
+        Adds finished text to the prompt context, keeping whole words within prompt_chars.
+        """
+        context = f"{self.context} {text.strip()}".strip()
+        if len(context) > self.prompt_chars:
+            context = context[-self.prompt_chars:].split(' ', 1)[-1]
+        self.context = context
@@ -0,0 +1,61 @@
+import numpy as np
+from PIL import Image
+
+
+class FrameChangeDetector:
+    """
+    FrameChangeDetector compares each captured frame with the last frame that
+    was processed, using a downsampled greyscale copy, and reports whether
+    enough pixels changed to be worth running OCR again.
+
+    Attributes:
+        threshold (float): Fraction of thumbnail pixels that must change.
+        pixel_tolerance (int): Grey-level difference below which a pixel counts as unchanged.
+        width (int): Width of the thumbnail frames are compared at.
+        previous (np.ndarray): Thumbnail of the last processed frame.
+        frames (int): Frames checked so far.
+        skipped (int): Frames reported as unchanged.
+    """
+
+    def __init__(self, threshold=0.0003, pixel_tolerance=24, width=320):
+        """
+        Initializes the FrameChangeDetector with the given parameters.
+        """
+        self.threshold = threshold
+        self.pixel_tolerance = pixel_tolerance
+        self.width = width
+        self.reset()
+
+    def reset(self):
+        self.previous = None
+        self.frames = 0
+        self.skipped = 0
+
+    def thumbnail(self, image: Image.Image) -> np.ndarray:
+        width = min(self.width, image.width)
+        height = max(1, round(image.height * width / image.width))
+        return np.asarray(image.convert('L').resize((width, height), Image.BILINEAR), dtype=np.int16)
+
+    def has_changed(self, image: Image.Image) -> bool:
+        """
+        Checks a frame against the last processed one.
+
+        Parameters:
+        image (Image): The captured frame.
+
+        Returns:
+        bool: True if the frame should be processed.
+        """
+        self.frames += 1
+        thumb = self.thumbnail(image)
+        if self.previous is not None and self.previous.shape == thumb.shape:
+            changed = np.count_nonzero(np.abs(thumb - self.previous) > self.pixel_tolerance) / thumb.size
+            if changed < self.threshold:
+                self.skipped += 1
+                return False
+        self.previous = thumb
+        return True
+
+    @property
+    def skip_rate(self) -> float:
+        return self.skipped / self.frames if self.frames else 0.0
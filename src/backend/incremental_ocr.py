@@ -0,0 +1,130 @@
+import hashlib
+from collections import OrderedDict
+import numpy as np
+
+
+class IncrementalOCR:
+    """
+    IncrementalOCR reads a caption region one text line at a time and only
+    sends lines it has not seen before to the recognizer.
+
+    The region is split into horizontal bands wherever rows contain text. Each
+    band is fingerprinted from its ink-cropped, quantized pixels, so a caption
+    line that is unchanged or has merely scrolled up keeps its fingerprint and
+    its cached text. New bands are recognized together in one batched call,
+    skipping easyocr's text detection entirely.
+
+    Attributes:
+        reader (easyocr.Reader): OCR reader used for new bands.
+        ink_contrast (int): Grey-level distance from the background that counts as text.
+        line_gap (int): Empty rows tolerated inside one text line.
+        min_band_height (int): Bands shorter than this many rows are ignored.
+        padding (int): Rows added above and below each band.
+        max_cache (int): Number of band results kept.
+        cache (OrderedDict): Recognized results by band fingerprint.
+        bands_seen (int): Bands found so far.
+        bands_recognized (int): Bands that had to be recognized.
+    """
+
+    def __init__(self, reader, ink_contrast=60, line_gap=3, min_band_height=6, padding=3, max_cache=512):
+        """
+        Initializes the IncrementalOCR with the given parameters.
+        """
+        self.reader = reader
+        self.ink_contrast = ink_contrast
+        self.line_gap = line_gap
+        self.min_band_height = min_band_height
+        self.padding = padding
+        self.max_cache = max_cache
+        self.cache = OrderedDict()
+        self.bands_seen = 0
+        self.bands_recognized = 0
+
+    def split_bands(self, ink):
+        """
+        Finds the row ranges that contain text.
+
+        Args:
+            ink (np.ndarray): Boolean text mask of the region.
+
+        Returns:
+            list: (top, bottom) row ranges, bottom exclusive.
+        """
+        rows = np.flatnonzero(ink.any(axis=1))
+        if not len(rows):
+            return []
+        # Split wherever the gap between text rows is wider than line_gap.
+        breaks = np.flatnonzero(np.diff(rows) > self.line_gap + 1)
+        starts = np.concatenate([[rows[0]], rows[breaks + 1]])
+        ends = np.concatenate([rows[breaks], [rows[-1]]]) + 1
+        height = ink.shape[0]
+        return [(max(0, int(top) - self.padding), min(height, int(bottom) + self.padding))
+                for top, bottom in zip(starts, ends) if bottom - top >= self.min_band_height]
+
+    @staticmethod
+    def fingerprint(band, band_ink):
+        columns = np.flatnonzero(band_ink.any(axis=0))
+        cropped = band[:, columns[0]:columns[-1] + 1] >> 4
+        return hashlib.blake2b(cropped.tobytes() + bytes(str(cropped.shape), 'ascii'), digest_size=16).digest()
+
+    def readtext(self, image_np):
+        """
+        Reads the text in the region, top to bottom.
+
+        Args:
+            image_np (np.ndarray): RGB(A) or greyscale image of the region.
+
+        Returns:
+            list: (bbox, text, prob) tuples like easyocr's readtext.
+        """
+        if image_np.ndim == 3:
+            grey = image_np[..., :3].mean(axis=2).astype(np.uint8)
+        else:
+            grey = image_np.astype(np.uint8, copy=False)
+        background = int(np.median(grey))
+        ink = np.abs(grey.astype(np.int16) - background) > self.ink_contrast
+
+        bands = []
+        pending = {}
+        for top, bottom in self.split_bands(ink):
+            key = self.fingerprint(grey[top:bottom], ink[top:bottom])
+            bands.append((top, bottom, key))
+            if key not in self.cache:
+                pending[top] = key
+        self.bands_seen += len(bands)
+
+        if pending:
+            self.recognize(grey, [(top, bottom) for top, bottom, key in bands if top in pending], pending)
+
+        results = []
+        width = grey.shape[1]
+        for top, bottom, key in bands:
+            entry = self.cache.get(key)
+            if entry is None:
+                continue
+            self.cache.move_to_end(key)
+            text, prob = entry
+            if text:
+                bbox = [[0, top], [width, top], [width, bottom], [0, bottom]]
+                results.append((bbox, text, prob))
+        return results
+
+    def recognize(self, grey, ranges, pending):
+        width = grey.shape[1]
+        horizontal_list = [[0, width, top, bottom] for top, bottom in ranges]
+        recognized = self.reader.recognize(grey, horizontal_list=horizontal_list, free_list=[],
+                                           batch_size=len(horizontal_list), detail=1, paragraph=False)
+        self.bands_recognized += len(ranges)
+
+        for top in pending:
+            self.cache[pending[top]] = ('', 0.0)
+        for box, text, prob in recognized:
+            key = pending.get(int(box[0][1]))
+            if key is not None:
+                self.cache[key] = (text, prob)
+        while len(self.cache) > self.max_cache:
+            self.cache.popitem(last=False)
+
+    @property
+    def reuse_rate(self):
+        return 1 - self.bands_recognized / self.bands_seen if self.bands_seen else 0.0
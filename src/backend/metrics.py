@@ -0,0 +1,270 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def percentile(values, q):
+    """
+    Linearly interpolated percentile of an already sorted list.
+    """
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class Histogram:
+    """
+    Histogram of durations with cumulative Prometheus-style buckets and a
+    rolling window of recent observations for percentiles.
+
+    Attributes:
+        buckets (tuple): Upper bounds of the buckets, in seconds.
+        counts (list): Observations per bucket, plus one for +Inf.
+        count (int): Total observations.
+        sum (float): Sum of all observations.
+        recent (deque): The latest observations, for percentiles.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, window=1024):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, value):
+        index = 0
+        while index < len(self.buckets) and value > self.buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+
+    def snapshot(self):
+        recent = sorted(self.recent)
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": percentile(recent, 50) if recent else None,
+            "p90": percentile(recent, 90) if recent else None,
+            "p99": percentile(recent, 99) if recent else None,
+            "max": recent[-1] if recent else None
+        }
+
+
+class Metrics:
+    """
+    Metrics collects stage timings for every phrase and frame and exports
+    them as a JSON snapshot or in the Prometheus text format.
+
+    Two kinds of measurement feed the histograms: timers around a function or
+    block (time(), timed()), and phrase traces, where mark() records the time
+    a phrase spent since its previous stage boundary. When disabled every
+    call returns immediately, so the instrumentation can stay in place.
+
+    Attributes:
+        enabled (bool): Whether anything is recorded.
+        port (int): Port of the HTTP endpoint, or None for no endpoint.
+        histograms (dict): Histogram per metric name.
+        counters (dict): Running total per counter name.
+    """
+
+    def __init__(self, enabled=False, port=None, window=1024, max_traces=1000):
+        self.enabled = enabled
+        self.port = port
+        self.window = window
+        self.max_traces = max_traces
+        self.histograms = {}
+        self.counters = {}
+        self._traces = OrderedDict()
+        self._lock = threading.Lock()
+        self._server = None
+
+    def observe(self, name: str, seconds: float):
+        """
+        Adds one duration to the named histogram.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(window=self.window)
+            histogram.observe(seconds)
+
+    def increment(self, name: str, value: float = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def time(self, name: str):
+        """
+        Returns a context manager that observes how long its block takes.
+        """
+        if not self.enabled:
+            return NULL_TIMER
+        return Timer(self, name)
+
+    def timed(self, name: str):
+        """
+        Decorator that observes how long every call of the function takes.
+        """
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def begin(self, key, timestamp: float = None):
+        """
+        Starts the trace of a phrase; timestamp (from time.perf_counter) can
+        place its start in the past, e.g. when its audio was captured.
+        """
+        if not self.enabled:
+            return
+        now = timestamp if timestamp is not None else time.perf_counter()
+        with self._lock:
+            self._traces[key] = [now, now]
+            while len(self._traces) > self.max_traces:
+                self._traces.popitem(last=False)
+
+    def mark(self, key, stage: str):
+        """
+        Records that a traced phrase finished a stage, observing the time
+        since its previous stage boundary as "<stage>_seconds".
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            trace = self._traces.get(key)
+            if trace is None:
+                return
+            elapsed = now - trace[1]
+            trace[1] = now
+        self.observe(f"{stage}_seconds", elapsed)
+
+    def finish(self, key, name: str):
+        """
+        Ends a trace, observing the time since it began as "<name>_seconds".
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            trace = self._traces.pop(key, None)
+        if trace is not None:
+            self.observe(f"{name}_seconds", now - trace[0])
+
+    def snapshot(self) -> dict:
+        """
+        Returns every histogram and counter as plain data, ready for json.dump.
+        """
+        with self._lock:
+            return {
+                "histograms": {name: histogram.snapshot() for name, histogram in sorted(self.histograms.items())},
+                "counters": dict(sorted(self.counters.items()))
+            }
+
+    def prometheus(self, prefix="translator") -> str:
+        """
+        Returns every histogram and counter in the Prometheus text format.
+        """
+        lines = []
+        with self._lock:
+            for name, histogram in sorted(self.histograms.items()):
+                metric = f"{prefix}_{name}"
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{le="+Inf"}} {histogram.count}')
+                lines.append(f"{metric}_sum {histogram.sum}")
+                lines.append(f"{metric}_count {histogram.count}")
+            for name, value in sorted(self.counters.items()):
+                metric = f"{prefix}_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value}")
+        return '\n'.join(lines) + '\n'
+
+    def start_server(self):
+        """
+        Serves /metrics (Prometheus) and /metrics.json on the configured port.
+        Does nothing when metrics are disabled, no port is set or the server
+        is already running.
+        """
+        if not self.enabled or not self.port or self._server is not None:
+            return
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body, content_type = metrics.prometheus(), "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body, content_type = json.dumps(metrics.snapshot()), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                payload = body.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        print(f"Metrics available at http://127.0.0.1:{self.port}/metrics")
+
+
+class Timer:
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_TIMER = NullTimer()
+
+metrics = Metrics(
+    enabled=os.getenv("TRANSLATOR_METRICS", "0") == "1",
+    port=int(os.getenv("TRANSLATOR_METRICS_PORT", "0")) or None
+)
@@ -0,0 +1,257 @@
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+from transcript_display import notify
+
+
+class ModelRegistry:
+    """
+    ModelRegistry loads each model at most once per process and hands the same
+    instance to every caller, so starting a new translator or capture session
+    reuses models that are already in memory.
+
+    Models are keyed by kind, name and device. Concurrent requests for a model
+    that is still loading wait for that load instead of starting another one.
+
+    Every get() counts as a user of the model until the caller hands it back
+    with release(). When a memory budget is set, the least recently used
+    models nobody is using are evicted once the estimated total size goes
+    over it; a model that is still in use stays, since dropping the registry's
+    reference would not free its memory anyway. Callers running a shared
+    model from several threads hold lock(model) around inference.
+
+    Attributes:
+        memory_budget (int): Maximum estimated bytes of loaded models, or None.
+        models (OrderedDict): Loaded models by key, least recently used first.
+        sizes (dict): Estimated size in bytes of each loaded model.
+        users (dict): Number of get() calls not released yet, per key.
+    """
+
+    def __init__(self, memory_budget=None):
+        """
+        Initializes the ModelRegistry with the given parameters.
+        """
+        self.memory_budget = memory_budget
+        self.models = OrderedDict()
+        self.sizes = {}
+        self.users = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._use_locks = weakref.WeakKeyDictionary()
+
+    def get(self, kind, name, device, loader, size=None):
+        """
+        Returns the model for the key, loading it with loader() on first use.
+
+        Args:
+            kind (str): Model family, e.g. "whisper", "tts" or "ocr".
+            name (str): Model name within the family.
+            device (str): Device the model lives on.
+            loader (callable): Builds the model when it is not loaded yet.
+            size (int): Size in bytes to account for, instead of estimating it.
+        """
+        key = (kind, name, device)
+        with self._lock:
+            if key in self.models:
+                self.models.move_to_end(key)
+                self.users[key] = self.users.get(key, 0) + 1
+                return self.models[key]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                if key in self.models:
+                    self.models.move_to_end(key)
+                    self.users[key] = self.users.get(key, 0) + 1
+                    return self.models[key]
+            notify(f"Loading {kind} model {name} on {device}...")
+            model = loader()
+            if size is None:
+                size = estimate_size(model)
+            with self._lock:
+                self.models[key] = model
+                self.sizes[key] = size
+                self.users[key] = self.users.get(key, 0) + 1
+                self._evict()
+        return model
+
+    def release(self, *models):
+        """
+        Hands back models obtained with get(); unused models become evictable.
+        Objects that are not registered models are ignored.
+        """
+        with self._lock:
+            for model in models:
+                for key, loaded in self.models.items():
+                    if loaded is model and self.users.get(key):
+                        self.users[key] -= 1
+                        break
+            self._evict()
+
+    def lock(self, model):
+        """
+        Returns the lock callers hold while running a shared model that is not
+        safe to call from several threads at once (Whisper's decoding hooks,
+        TTS and easyocr keep per-call state on the model).
+        """
+        with self._lock:
+            lock = self._use_locks.get(model)
+            if lock is None:
+                lock = self._use_locks[model] = threading.RLock()
+            return lock
+
+    def evict(self, kind, name, device):
+        """
+        Drops a model from the registry unless it is still in use.
+
+        Returns:
+            bool: Whether the model was dropped.
+        """
+        key = (kind, name, device)
+        with self._lock:
+            if self.users.get(key) or key not in self.models:
+                return False
+            self._drop(key)
+            return True
+
+    def _evict(self):
+        if self.memory_budget is None:
+            return
+        for key in list(self.models):
+            if sum(self.sizes.values()) <= self.memory_budget:
+                break
+            if not self.users.get(key):
+                notify(f"Evicting {key[0]} model {key[1]} on {key[2]} to stay within the memory budget")
+                self._drop(key)
+
+    def _drop(self, key):
+        if self.models.pop(key, None) is None:
+            return
+        self.sizes.pop(key, None)
+        self.users.pop(key, None)
+        try:
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except ImportError:
+            pass
+
+    def stats(self):
+        """
+        Returns the estimated size in bytes of every loaded model.
+        """
+        with self._lock:
+            return {'/'.join(key): size for key, size in self.sizes.items()}
+
+
+def estimate_size(model):
+    """
+    Estimates the memory held by a model from its torch parameters and buffers.
+    Objects that wrap several modules (TTS, easyocr.Reader) are searched one
+    attribute level deep.
+    """
+    try:
+        import torch
+    except ImportError:
+        return 0
+
+    def module_size(module):
+        tensors = list(module.parameters()) + list(module.buffers())
+        return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+    if isinstance(model, torch.nn.Module):
+        return module_size(model)
+    return sum(module_size(value) for value in vars(model).values() if isinstance(value, torch.nn.Module))
+
+
+def default_device():
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+budget_mb = os.getenv("MODEL_MEMORY_BUDGET_MB")
+registry = ModelRegistry(memory_budget=int(budget_mb) * 1024 * 1024 if budget_mb else None)
+
+
+def preload(getter, *args, **kwargs):
+    """
+    Runs one of the get_* functions below on a background thread, so the
+    model is ready by the time it is first used.
+
+    Returns:
+        Thread: The loading thread.
+    """
+    thread = threading.Thread(target=getter, args=args, kwargs=kwargs, daemon=True)
+    thread.start()
+    return thread
+
+
+def get_whisper_model(name, device=None):
+    """
+    Returns the shared Whisper model with the given name.
+    """
+    device = device or default_device()
+
+    def loader():
+        import whisper
+        return whisper.load_model(name, device=device)
+    return registry.get("whisper", name, device, loader)
+
+
+def get_asr_backend(name, backend=None, device=None, threads=None):
+    """
+    Returns the shared speech recognizer for a Whisper model name, loaded with
+    the configured backend (see asr_backends.load_backend). Callers asking for
+    different thread counts get separate instances.
+    """
+    from asr_backends import load_backend
+    backend = backend or os.getenv("ASR_BACKEND", "whisper")
+    device = "cpu" if backend == "whisper-int8" else device or default_device()
+    threads = threads if threads is not None else int(os.getenv("ASR_THREADS", "0"))
+
+    def loader():
+        return load_backend(name, backend=backend, device=device, threads=threads)
+    return registry.get("asr", f"{backend}:{name}:{threads}", device, loader)
+
+
+def get_tts_model(name, gpu=True):
+    """
+    Returns the shared coqui TTS model with the given name.
+    """
+    device = "cuda" if gpu and default_device() == "cuda" else "cpu"
+
+    def loader():
+        from TTS.api import TTS
+        return TTS(model_name=name, progress_bar=False, gpu=gpu)
+    return registry.get("tts", name, device, loader)
+
+
+def get_ocr_reader(languages, gpu=True):
+    """
+    Returns the shared easyocr reader for the given languages.
+    """
+    device = "cuda" if gpu and default_device() == "cuda" else "cpu"
+
+    def loader():
+        import easyocr
+        return easyocr.Reader(languages, gpu=gpu)
+    return registry.get("ocr", '+'.join(languages), device, loader)
+
+
+def get_voice_profile(tts_name, speaker_wav, cache_path=None, gpu=True):
+    """
+    Returns the shared voice profile of a reference recording for a TTS model.
+    """
+    tts = get_tts_model(tts_name, gpu=gpu)
+    device = "cuda" if gpu and default_device() == "cuda" else "cpu"
+
+    def loader():
+        from voice_profile import VoiceProfile
+        return VoiceProfile(tts, speaker_wav, cache_path=cache_path)
+    # The profile's own tensors are tiny; its TTS model is accounted for separately
+    # and counts as used by whoever uses the profile's synthesis.
+    profile = registry.get("voice", f"{tts_name}:{speaker_wav}", device, loader, size=0)
+    registry.release(tts)
+    return profile
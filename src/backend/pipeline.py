@@ -0,0 +1,112 @@
+import inspect
+import threading
+from queue import Queue
+
+from transcript_display import notify
+
+STOP = object()
+
+
+class PipelineStage:
+    """
+    PipelineStage runs a handler on its own worker thread, reading items from a
+    bounded input queue and passing each result to the next stage.
+
+    Putting into a full queue blocks, so a slow stage holds back the stage in
+    front of it instead of letting work pile up without bound.
+
+    Attributes:
+        name (str): Stage name used when reporting queue depths.
+        handler (callable): Function applied to every item; returning None drops the item.
+            A generator handler passes on each yielded result as soon as it is produced.
+        input (Queue): Bounded queue of pending items.
+        output (PipelineStage): Next stage, or None for the last one.
+        processed (int): Number of items handled so far.
+    """
+
+    def __init__(self, name, handler, maxsize=4):
+        """
+        Initializes the PipelineStage with the given parameters.
+        """
+        self.name = name
+        self.handler = handler
+        self.input = Queue(maxsize=maxsize)
+        self.output = None
+        self.processed = 0
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name=f"pipeline-{self.name}", daemon=True)
+        self.thread.start()
+
+    def put(self, item):
+        """
+        Queues an item, blocking while the stage is full.
+        """
+        self.input.put(item)
+
+    def run(self):
+        while True:
+            item = self.input.get()
+            if item is STOP:
+                if self.output is not None:
+                    self.output.put(STOP)
+                break
+            try:
+                result = self.handler(item)
+                if inspect.isgenerator(result):
+                    for partial in result:
+                        self.forward(partial)
+                else:
+                    self.forward(result)
+            except Exception as e:
+                notify(f"Error in {self.name} stage: {e}")
+                continue
+            self.processed += 1
+
+    def forward(self, result):
+        if result is not None and self.output is not None:
+            self.output.put(result)
+
+
+class Pipeline:
+    """
+    Pipeline chains stages so that each one works on a different item at the
+    same time, e.g. translating phrase N while phrase N+1 is transcribed.
+
+    Attributes:
+        stages (list): The PipelineStage objects in order.
+    """
+
+    def __init__(self, stages):
+        """
+        Initializes the Pipeline and links consecutive stages.
+        """
+        self.stages = stages
+        for current, following in zip(stages, stages[1:]):
+            current.output = following
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+
+    def put(self, item):
+        """
+        Feeds an item to the first stage, blocking while it is full.
+        """
+        self.stages[0].put(item)
+
+    def stop(self):
+        """
+        Lets every stage finish its queued items and waits for the workers.
+        """
+        self.stages[0].put(STOP)
+        for stage in self.stages:
+            if stage.thread is not None:
+                stage.thread.join()
+
+    def queue_depths(self):
+        """
+        Returns the number of items waiting in front of each stage.
+        """
+        return {stage.name: stage.input.qsize() for stage in self.stages}
@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import deque
+import numpy as np
+import pyaudio
+
+from metrics import metrics
+
+
+class PlaybackEngine:
+    """
+    PlaybackEngine keeps one PyAudio output stream open on a device and plays
+    queued waveforms back to back from the stream callback, so consecutive
+    clips follow each other without gaps and no stream is opened per phrase.
+    The time from queueing a clip to its first frame reaching the device is
+    recorded as voice_playback_wait_seconds.
+
+    Attributes:
+        p (PyAudio): PyAudio instance that owns the stream.
+        output_device_index (int): Device the stream plays to.
+        sample_rate (int): Stream sample rate, taken from the first clip.
+        frames_per_buffer (int): Frames requested per callback.
+        clips (deque): Int16 clips waiting to be played, with the time each was queued.
+        position (int): Next frame to play from the first clip.
+        idle (Event): Set while nothing is queued.
+    """
+
+    def __init__(self, p, output_device_index, frames_per_buffer=1024):
+        """
+        Initializes the PlaybackEngine with the given parameters.
+        """
+        self.p = p
+        self.output_device_index = output_device_index
+        self.frames_per_buffer = frames_per_buffer
+        self.sample_rate = None
+        self.stream = None
+        self.clips = deque()
+        self.position = 0
+        self.lock = threading.Lock()
+        self.idle = threading.Event()
+        self.idle.set()
+
+    def open(self, sample_rate):
+        """
+        Opens the persistent output stream at the given sample rate.
+        """
+        self.sample_rate = sample_rate
+        self.stream = self.p.open(format=pyaudio.paInt16,
+                                  channels=1,
+                                  rate=sample_rate,
+                                  output=True,
+                                  output_device_index=self.output_device_index,
+                                  frames_per_buffer=self.frames_per_buffer,
+                                  stream_callback=self.callback)
+        self.stream.start_stream()
+
+    def play(self, wav, sample_rate):
+        """
+        Queues a waveform for playback and returns immediately.
+
+        Args:
+            wav (np.ndarray or list): Float waveform in [-1, 1], as returned by TTS.
+                A float32 array is converted in place and must not be reused.
+            sample_rate (int): Sample rate of the waveform.
+        """
+        if self.stream is None:
+            self.open(sample_rate)
+
+        audio = np.asarray(wav, dtype=np.float32)
+        if not audio.flags.writeable:
+            audio = audio.copy()
+        if sample_rate != self.sample_rate:
+            duration = len(audio) / sample_rate
+            positions = np.arange(int(duration * self.sample_rate)) / self.sample_rate
+            audio = np.interp(positions, np.arange(len(audio)) / sample_rate, audio).astype(np.float32)
+
+        # Scale to the device format in place; only the final int16 cast allocates.
+        np.clip(audio, -1.0, 1.0, out=audio)
+        np.multiply(audio, 32767.0, out=audio)
+        clip = audio.astype(np.int16)
+
+        with self.lock:
+            self.clips.append((clip, time.perf_counter()))
+            self.idle.clear()
+
+    def callback(self, in_data, frame_count, time_info, status):
+        out = np.zeros(frame_count, dtype=np.int16)
+        filled = 0
+        started = []
+        with self.lock:
+            while filled < frame_count and self.clips:
+                clip, queued = self.clips[0]
+                if self.position == 0:
+                    started.append(queued)
+                take = min(frame_count - filled, len(clip) - self.position)
+                out[filled:filled + take] = clip[self.position:self.position + take]
+                filled += take
+                self.position += take
+                if self.position >= len(clip):
+                    self.clips.popleft()
+                    self.position = 0
+            if not self.clips:
+                self.idle.set()
+        now = time.perf_counter()
+        for queued in started:
+            metrics.observe("voice_playback_wait_seconds", now - queued)
+        return (out.tobytes(), pyaudio.paContinue)
+
+    @property
+    def pending_seconds(self):
+        """
+        Seconds of audio queued ahead of the next clip.
+        """
+        with self.lock:
+            frames = sum(len(clip) for clip, queued in self.clips) - self.position
+        return frames / self.sample_rate if self.sample_rate else 0.0
+
+    def wait_until_done(self, timeout=None):
+        """
+        Blocks until every queued clip has been handed to the device.
+        """
+        return self.idle.wait(timeout)
+
+    def close(self):
+        """
+        Stops and closes the output stream, dropping anything still queued.
+        """
+        with self.lock:
+            self.clips.clear()
+            self.position = 0
+            self.idle.set()
+        if self.stream is not None:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
@@ -3,14 +3,20 @@ import pyautogui
 import time
 import threading
 from io import BytesIO
-import easyocr
 from PIL import Image
 import numpy as np
-from translation import organise_transcript, organise_buffer, format_transcript_markdown
+from translation import TranslationCoalescer
+from model_registry import registry, get_ocr_reader
+from frame_change import FrameChangeDetector
+from incremental_ocr import IncrementalOCR
+from transcript_merge import merge_caption_words
+from transcript_store import TranscriptStore
+from transcript_display import TranscriptFeed, TerminalDisplay
+from metrics import metrics
 import queue
 
 class ScreenCapture:
-    def __init__(self):
+    def __init__(self, change_threshold=0.0003, incremental_ocr=True):
         self.region = None
         self.running = False
         self.thread = None
@@ -20,11 +26,21 @@ class ScreenCapture:
         self.end_y = None
         self.root = None
         self.canvas = None
-        self.reader = easyocr.Reader(['en'])  # Initialize OCR reader
+        self.reader = None  # Shared OCR reader, loaded on first capture
+        self.incremental_ocr = incremental_ocr
+        self.ocr = None
         self.word_buffer = []
+        self.transcript = TranscriptStore()
+        self.translator = None  # Created by start_capture and closed by stop_capture
+        self.feed = TranscriptFeed()  # Segments that changed, for the display
         self.max_words = 100
         self.processed_buffer_words = 300
-        self.formatted_buffer = ' '
+        self.change_detector = FrameChangeDetector(threshold=change_threshold)
+
+    @property
+    def formatted_buffer(self):
+        # The whole document, built on demand; the display only receives changed segments through feed
+        return self.transcript.render_markdown() or ' '
 
     def select_region(self):
         self.root = tk.Tk()
@@ -54,47 +70,70 @@ class ScreenCapture:
 
     def capture_screen(self):
         while self.running:
+            # Each frame is traced from the moment it was grabbed
+            metrics.begin((id(self), "frame"))
             screenshot = pyautogui.screenshot(region=self.region)
-            buffer = BytesIO()
-            screenshot.save(buffer, format='PNG')
-            buffer.seek(0)
-            self.process_image(buffer)
+            metrics.mark((id(self), "frame"), "screen_capture")
+            metrics.increment("screen_frames")
+            # Skip OCR and translation while the captions have not changed
+            if self.change_detector.has_changed(screenshot):
+                buffer = BytesIO()
+                screenshot.save(buffer, format='PNG')
+                buffer.seek(0)
+                self.process_image(buffer)
             time.sleep(2)
 
+    @metrics.timed("screen_process_image_seconds")
     def process_image(self, image_buffer: BytesIO):
+        frame = (id(self), "frame")
         image = Image.open(image_buffer)
         image_np = np.array(image)
-        result = self.reader.readtext(image_np)
+        with registry.lock(self.reader):
+            if self.ocr is not None:
+                # Only caption lines that were not on screen before are recognized
+                result = self.ocr.readtext(image_np)
+            else:
+                result = self.reader.readtext(image_np)
+        metrics.mark(frame, "screen_ocr")
         new_text = ' '.join([text for (bbox, text, prob) in result])
         new_words = new_text.split()
-        self.word_buffer.extend(new_words)
 
-        # Limit the buffer to the most recent 100 words
+        # Align the frame with the source words already seen; only new caption text is translated
+        delta_words = merge_caption_words(self.word_buffer, new_words)
+        metrics.mark(frame, "screen_merge")
+        if not delta_words:
+            return []
+        self.word_buffer.extend(delta_words)
+
+        # Keep the most recent 100 source words as alignment context
         if len(self.word_buffer) > self.max_words:
             self.word_buffer = self.word_buffer[-self.max_words:]
 
-        buffer_text = ' '.join(self.word_buffer)
-        translated_text = organise_transcript(buffer_text)
-        
-        # Update word buffer
-        self.word_buffer = self.update_buffer(self.word_buffer, translated_text.split())
-        buffer_string = ' '.join(self.word_buffer)
-        self.formatted_buffer = format_transcript_markdown(buffer_string)
-        print("Buffer formateado:", self.formatted_buffer)
-        return self.formatted_buffer
-
-    def update_buffer(self, current_words: list, new_words: list) -> list:
-        new_buffer = organise_buffer(' '.join(current_words), ' '.join(new_words))
-        new_buffer_words = new_buffer.split()
+        # Split the new text into speaker segments and translate only what each segment gained;
+        # segments read from the same frame go out in one batched request
+        changes = self.transcript.add_source_text(' '.join(delta_words))
+        futures = self.translator.submit_many([added_text for segment, added_text in changes])
+        for (segment, added_text), future in zip(changes, futures):
+            self.transcript.append_translation(segment.id, future.result())
+            # Only the segment that changed is sent to the display
+            self.feed.publish(segment.id, self.transcript.render_segment(segment.id))
+        metrics.mark(frame, "screen_translation")
+        metrics.finish(frame, "screen_end_to_end")
+        return [segment.id for segment, added_text in changes]
 
-        if len(new_buffer_words) > self.max_words:
-            new_buffer_words = new_buffer_words[-self.max_words:]
-        
-        return new_buffer_words
+    def load_reader(self):
+        if self.reader is None:
+            self.reader = get_ocr_reader(['en'])
+        if self.incremental_ocr and self.ocr is None:
+            self.ocr = IncrementalOCR(self.reader)
 
     def start_capture(self):
         if not self.region:
             self.select_region()
+        self.load_reader()
+        if self.translator is None:
+            self.translator = TranslationCoalescer(output_language="Spanish", prompt="transcript")
+        metrics.start_server()
         self.running = True
         self.thread = threading.Thread(target=self.capture_screen)
         self.thread.start()
@@ -105,9 +144,20 @@ class ScreenCapture:
         if self.thread:
             self.thread.join()
         print("Stopped screen capture.")
+        print(f"Unchanged frames skipped: {self.change_detector.skipped}/{self.change_detector.frames} ({self.change_detector.skip_rate:.0%})")
+        if self.ocr is not None:
+            print(f"Caption lines reused from cache: {self.ocr.reuse_rate:.0%}")
+        # The reader is handed back so the registry may evict it; the next start loads it again.
+        registry.release(self.reader)
+        self.reader = None
+        self.ocr = None
+        print(f"Translation requests: {self.translator.requests} for {self.translator.segments} segments")
+        self.translator.close()
+        self.translator = None
 
 if __name__ == "__main__":
     sc = ScreenCapture()
+    TerminalDisplay(sc.feed).start()
     sc.start_capture()
     try:
         while True:
@@ -0,0 +1,424 @@
+import argparse
+import json
+import socketserver
+import threading
+import numpy as np
+from collections import deque
+
+from vad import VoiceActivityDetector
+from decoding_state import DecodingSession, LogMelCache
+from model_registry import registry, get_asr_backend
+from translation import TranslationCoalescer
+from metrics import metrics
+
+SAMPLE_RATE = 16000
+
+
+class StreamSession:
+    """
+    StreamSession is one connected audio stream: it splits the incoming audio
+    into phrases with its own VAD and hands the server one window at a time,
+    either the latest state of the open phrase (a partial) or a closed phrase
+    (a final).
+
+    Attributes:
+        session_id (int): Number of the session on its server.
+        send (callable): Sends one JSON-serializable message to the client.
+        output_language (str): Language finals are translated into, or None.
+        vad (VoiceActivityDetector): Phrase segmentation of the stream.
+        decoding (DecodingSession): Language detected and locked for the stream.
+        mel_cache (LogMelCache): Spectrogram of the phrase being decoded.
+        max_phrase (float): Seconds after which an open phrase is closed.
+        phrase (list): Speech pieces of the open phrase.
+        finals (deque): Closed (start, end, audio) phrases waiting for decoding.
+        dirty (bool): Whether the open phrase has audio not decoded yet.
+        closed (bool): Whether the client has finished sending audio.
+        pending (int): Windows and translations taken but not delivered yet.
+        done (threading.Event): Set once everything was delivered after close.
+    """
+
+    def __init__(self, session_id, send, audio_model, filters, output_language=None, language=None, max_phrase=25.0):
+        """
+        Initializes the StreamSession with the given parameters.
+        """
+        self.session_id = session_id
+        self.send = send
+        self.output_language = output_language
+        self.vad = VoiceActivityDetector(sample_rate=SAMPLE_RATE)
+        self.decoding = DecodingSession(audio_model, language=language)
+        self.mel_cache = LogMelCache(filters)
+        self.max_phrase = max_phrase
+        self.phrase = []
+        self.phrase_start = 0.0
+        self.phrase_end = 0.0
+        self.finals = deque()
+        self.dirty = False
+        self.closed = False
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+
+    @property
+    def has_work(self):
+        return bool(self.finals) or self.dirty
+
+    def feed(self, audio_np):
+        for segment in self.vad.feed(audio_np):
+            self.add_segment(segment)
+
+    def add_segment(self, segment):
+        if not self.phrase:
+            self.phrase_start = segment.start
+        self.phrase.append(segment.audio)
+        self.phrase_end = segment.end
+        # Whisper sees at most 30 seconds, so long phrases are cut before that.
+        if segment.complete or self.phrase_end - self.phrase_start >= self.max_phrase:
+            self.finals.append((self.phrase_start, self.phrase_end, np.concatenate(self.phrase)))
+            self.phrase = []
+            self.dirty = False
+        else:
+            self.dirty = True
+
+    def finish(self):
+        """
+        Closes the phrase in progress once the client stops sending.
+        """
+        segment = self.vad.flush()
+        if segment is not None:
+            self.add_segment(segment)
+        if self.phrase:
+            self.finals.append((self.phrase_start, self.phrase_end, np.concatenate(self.phrase)))
+            self.phrase = []
+            self.dirty = False
+        self.closed = True
+        self.check_done()
+
+    def next_window(self):
+        """
+        Takes the next window to decode: the oldest closed phrase, else the open one.
+
+        Returns:
+            tuple: (final, start, end, audio), or None when there is nothing new.
+        """
+        if not self.has_work:
+            return None
+        # Counted before the window leaves the queue, so check_done never sees neither.
+        with self.lock:
+            self.pending += 1
+        if self.finals:
+            return (True,) + self.finals.popleft()
+        self.dirty = False
+        return (False, self.phrase_start, self.phrase_end, np.concatenate(self.phrase))
+
+    def deliver(self, window, text, coalescers):
+        """
+        Sends the decoded text of a window and, for finals, queues its translation.
+        """
+        final, start, end, _ = window
+        self.send({"type": "final" if final else "partial", "start": start, "end": end, "text": text})
+        if final and text and self.output_language:
+            future = coalescers(self.output_language).submit(text)
+            with self.lock:
+                self.pending += 1
+            future.add_done_callback(lambda future: self.deliver_translation(start, end, text, future))
+        self.release()
+
+    def fail(self, window, error):
+        """
+        Reports a window that could not be decoded, so the client and the handler are not left waiting.
+        """
+        final, start, end, _ = window
+        self.send({"type": "error", "final": final, "start": start, "end": end, "error": str(error)})
+        self.release()
+
+    def deliver_translation(self, start, end, text, future):
+        try:
+            translation = future.result()
+        except Exception as e:
+            translation = None
+            print(f"Session {self.session_id}: translation failed: {e}")
+        self.send({"type": "translation", "start": start, "end": end, "text": text, "translation": translation})
+        self.release()
+
+    def release(self):
+        with self.lock:
+            self.pending -= 1
+        self.check_done()
+
+    def check_done(self):
+        with self.lock:
+            if self.closed and not self.has_work and not self.pending:
+                self.done.set()
+
+
+class SessionServer:
+    """
+    SessionServer accepts many concurrent audio streams over TCP and
+    transcribes all of them with one shared Whisper model.
+
+    A single decoder thread collects the pending windows of every session and
+    runs them through the model as one batch: the log-mel spectrograms are
+    stacked and passed to whisper.decode together, so the encoder and every
+    decoding step run once per batch instead of once per stream. Sessions are
+    visited round-robin and contribute at most one window per batch, so a busy
+    stream cannot starve a quiet one. Windows are grouped by their locked
+    language, since DecodingOptions apply to a whole batch; undetected streams
+    share one batch in which Whisper detects each language separately. Per-
+    stream prompts are not used for the same reason.
+
+    Protocol: the client sends one JSON line, e.g. {"output_language": "Spanish",
+    "language": null}, then raw 16-bit mono PCM at 16 kHz, and shuts down its
+    write side when done. The server answers with JSON lines of type
+    "partial", "final" and, when output_language is set, "translation", and
+    closes the connection once everything was delivered.
+
+    Attributes:
+        audio_model (ASRBackend): The shared Whisper backend ("whisper" or "whisper-int8").
+        max_batch (int): Maximum number of windows per forward pass.
+        max_phrase (float): Seconds after which an open phrase is closed.
+        sessions (list): Connected sessions, in round-robin order.
+        batches (int): Batches decoded so far.
+        windows (int): Windows decoded so far.
+    """
+
+    def __init__(self, model="small", asr_backend=None, host="127.0.0.1", port=8770, max_batch=8, max_phrase=25.0):
+        """
+        Initializes the SessionServer and loads the shared model.
+        """
+        self.audio_model = get_asr_backend(model, backend=asr_backend)
+        self.filters = self.audio_model.mel_filters()
+        if self.filters is None:
+            raise ValueError("The session server needs the whisper or whisper-int8 ASR backend")
+        self.max_batch = max_batch
+        self.max_phrase = max_phrase
+        self.sessions = []
+        self.next_session = 0
+        self.session_count = 0
+        self.batches = 0
+        self.windows = 0
+        self.running = False
+        self.condition = threading.Condition()
+        self.coalescers = {}
+        self.coalescers_lock = threading.Lock()
+        self.server = socketserver.ThreadingTCPServer((host, port), self.make_handler(), bind_and_activate=False)
+        self.server.daemon_threads = True
+        self.server.allow_reuse_address = True
+        self.server.server_bind()
+        self.server.server_activate()
+
+    @property
+    def address(self):
+        return self.server.server_address[:2]
+
+    def coalescer(self, output_language):
+        """
+        Returns the translation coalescer shared by every session with this output language.
+        """
+        with self.coalescers_lock:
+            if output_language not in self.coalescers:
+                self.coalescers[output_language] = TranslationCoalescer(output_language=output_language, prompt="translation")
+            return self.coalescers[output_language]
+
+    def open_session(self, send, header):
+        with self.condition:
+            self.session_count += 1
+            session = StreamSession(self.session_count, send, self.audio_model, self.filters,
+                                    output_language=header.get("output_language"),
+                                    language=header.get("language"),
+                                    max_phrase=self.max_phrase)
+            self.sessions.append(session)
+        print(f"Session {session.session_id} opened ({len(self.sessions)} active)")
+        return session
+
+    def feed(self, session, audio_np):
+        with self.condition:
+            session.feed(audio_np)
+            if session.has_work:
+                self.condition.notify()
+
+    def finish_session(self, session):
+        with self.condition:
+            session.finish()
+            self.condition.notify()
+
+    def close_session(self, session):
+        with self.condition:
+            index = self.sessions.index(session)
+            self.sessions.remove(session)
+            if index < self.next_session:
+                self.next_session -= 1
+            if self.sessions:
+                self.next_session %= len(self.sessions)
+            else:
+                self.next_session = 0
+        print(f"Session {session.session_id} closed ({len(self.sessions)} active)")
+
+    def next_batch(self):
+        """
+        Waits for pending windows and takes up to max_batch of them, one per
+        session, starting after the last session served.
+
+        Returns:
+            list: (session, window) pairs, or an empty list once the server stops.
+        """
+        with self.condition:
+            while self.running and not any(session.has_work for session in self.sessions):
+                self.condition.wait()
+            batch = []
+            count = len(self.sessions)
+            for step in range(count):
+                session = self.sessions[(self.next_session + step) % count]
+                window = session.next_window()
+                if window is not None:
+                    batch.append((session, window))
+                    if len(batch) == self.max_batch:
+                        break
+            if count:
+                # The next batch starts with the session after the last one served.
+                self.next_session = (self.next_session + (step + 1 if len(batch) == self.max_batch else 1)) % count
+            return batch
+
+    def decode_loop(self):
+        while self.running:
+            batch = self.next_batch()
+            if not batch:
+                continue
+            groups = {}
+            for session, window in batch:
+                groups.setdefault(session.decoding.language, []).append((session, window))
+            for language, items in groups.items():
+                # A failed decode is reported to its sessions; the decoder goes on with the next batch.
+                delivered = 0
+                try:
+                    with metrics.time("server_batch_seconds"):
+                        texts = self.decode(language, items)
+                    for (session, window), text in zip(items, texts):
+                        session.deliver(window, text, self.coalescer)
+                        delivered += 1
+                except Exception as e:
+                    print(f"Decoding a batch of {len(items)} windows failed: {e}")
+                    metrics.increment("server_failed_windows", len(items) - delivered)
+                    for session, window in items[delivered:]:
+                        session.fail(window, e)
+            self.batches += 1
+            self.windows += len(batch)
+            metrics.increment("server_batches")
+            metrics.increment("server_windows", len(batch))
+
+    def decode(self, language, items):
+        """
+        Decodes the windows of several sessions in one batched forward pass.
+
+        Args:
+            language (str): Language shared by the windows, or None to detect it per window.
+            items (list): (session, window) pairs.
+
+        Returns:
+            list: The text of every window, in order.
+        """
+        import torch
+        import whisper
+
+        mels = [session.mel_cache.log_mel(window[3]) for session, window in items]
+        texts = [''] * len(items)
+        decodable = [index for index, mel in enumerate(mels) if mel is not None]
+        if not decodable:
+            return texts
+
+        model = self.audio_model.model
+        fp16 = self.audio_model.device == "cuda"
+        mel = torch.from_numpy(np.stack([mels[index] for index in decodable]))
+        mel = mel.to(model.device, torch.float16 if fp16 else torch.float32)
+        options = whisper.DecodingOptions(task="transcribe", language=language, fp16=fp16, without_timestamps=True)
+        with registry.lock(self.audio_model), self.audio_model.cpu_threads():
+            results = whisper.decode(model, mel, options)
+
+        for index, result in zip(decodable, results):
+            session = items[index][0]
+            if language is None:
+                probability = result.language_probs.get(result.language) if result.language_probs else None
+                session.decoding.observe(result.language, probability)
+            # Whisper's own silence rule: likely no speech and a poor decode.
+            if result.no_speech_prob > 0.6 and result.avg_logprob < -1.0:
+                continue
+            texts[index] = result.text.strip()
+        return texts
+
+    def make_handler(self):
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                header = json.loads(self.rfile.readline() or b"{}")
+                send_lock = threading.Lock()
+
+                def send(message):
+                    try:
+                        with send_lock:
+                            self.wfile.write(json.dumps(message).encode() + b"\n")
+                    except OSError:
+                        pass  # The client went away; its session still drains.
+
+                session = server.open_session(send, header)
+                remainder = b''
+                try:
+                    while True:
+                        data = self.rfile.read1(65536)
+                        if not data:
+                            break
+                        data = remainder + data
+                        usable = len(data) - len(data) % 2
+                        remainder = data[usable:]
+                        audio_np = np.frombuffer(data[:usable], dtype=np.int16).astype(np.float32) / 32768.0
+                        server.feed(session, audio_np)
+                finally:
+                    server.finish_session(session)
+                    session.done.wait()
+                    server.close_session(session)
+
+        return Handler
+
+    def start(self):
+        """
+        Starts the decoder thread and serves connections from a background thread.
+        """
+        self.running = True
+        threading.Thread(target=self.decode_loop, daemon=True).start()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        metrics.start_server()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        for coalescer in self.coalescers.values():
+            coalescer.close()
+        registry.release(self.audio_model)
+        if self.batches:
+            print(f"Decoded {self.windows} windows in {self.batches} batches ({self.windows / self.batches:.1f} per batch)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcribe many audio streams with one shared Whisper model.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8770)
+    parser.add_argument("--model", default="small", help="Whisper model name")
+    parser.add_argument("--asr-backend", choices=["whisper", "whisper-int8"], help="Defaults to ASR_BACKEND or whisper")
+    parser.add_argument("--max-batch", type=int, default=8, help="Maximum windows per forward pass")
+    args = parser.parse_args()
+
+    server = SessionServer(model=args.model, asr_backend=args.asr_backend, host=args.host, port=args.port,
+                           max_batch=args.max_batch).start()
+    host, port = server.address
+    print(f"Session server listening on {host}:{port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import re
+import numpy as np
+
+
+class StreamingTranscriber:
+    """
+    StreamingTranscriber keeps a rolling audio window for one phrase and commits
+    the words Whisper agrees on across consecutive hypotheses, so only the
+    uncommitted tail of the phrase is decoded again on every update.
+
+    Attributes:
+        audio_model (ASRBackend): Speech recognizer with Whisper's transcribe() interface.
+        sample_rate (int): Sample rate of the incoming audio.
+        max_window (float): Maximum length in seconds of the uncommitted window.
+        audio_buffer (np.ndarray): Uncommitted audio still being decoded.
+        buffer_offset (float): Phrase time in seconds where the window starts.
+        committed_words (list): Committed (start, end, word) tuples.
+        hypothesis (list): Tentative (start, end, word) tuples from the last pass.
+        dirty (bool): Whether audio was inserted since the last decoding pass.
+    """
+
+    def __init__(self, audio_model, sample_rate=16000, max_window=15.0, **transcribe_options):
+        """
+        Initializes the StreamingTranscriber with the given parameters.
+        """
+        self.audio_model = audio_model
+        self.sample_rate = sample_rate
+        self.max_window = max_window
+        self.transcribe_options = transcribe_options
+        self.reset()
+
+    def reset(self):
+        """
+        Clears the window and every committed or tentative word.
+        """
+        self.audio_buffer = np.zeros(0, dtype=np.float32)
+        self.buffer_offset = 0.0
+        self.committed_words = []
+        self.hypothesis = []
+        self.dirty = False
+
+    @property
+    def committed_text(self):
+        return ''.join(word for _, _, word in self.committed_words).strip()
+
+    @property
+    def tentative_text(self):
+        return ''.join(word for _, _, word in self.hypothesis).strip()
+
+    @property
+    def text(self):
+        """
+        Returns the committed text followed by the current tentative tail.
+        """
+        return ''.join(word for _, _, word in self.committed_words + self.hypothesis).strip()
+
+    def insert_audio(self, audio_np):
+        """
+        Appends new audio samples to the rolling window.
+
+        Args:
+            audio_np (np.ndarray): Float32 mono audio at ``sample_rate``.
+        """
+        self.audio_buffer = np.concatenate([self.audio_buffer, audio_np])
+        self.dirty = True
+
+    def transcribe_window(self):
+        """
+        Decodes the uncommitted window and returns its words in phrase time.
+        """
+        prompt = self.committed_text[-200:] or None
+        result = self.audio_model.transcribe(self.audio_buffer,
+                                             word_timestamps=True,
+                                             condition_on_previous_text=False,
+                                             initial_prompt=prompt,
+                                             **self.transcribe_options)
+        last_end = self.committed_words[-1][1] if self.committed_words else 0.0
+        words = []
+        for segment in result['segments']:
+            for word in segment.get('words', []):
+                start = word['start'] + self.buffer_offset
+                end = word['end'] + self.buffer_offset
+                # Words straddling the trim point were already committed.
+                if end <= last_end:
+                    continue
+                words.append((start, end, word['word']))
+        return words
+
+    def process_iter(self):
+        """
+        Runs one decoding pass over the uncommitted window and commits the
+        longest word prefix shared with the previous hypothesis.
+
+        Returns:
+            str: The committed text followed by the current tentative tail.
+        """
+        if not len(self.audio_buffer):
+            return self.text
+        words = self.transcribe_window()
+        self.dirty = False
+
+        agreed = 0
+        for previous, current in zip(self.hypothesis, words):
+            if normalize_word(previous[2]) != normalize_word(current[2]):
+                break
+            agreed += 1
+
+        self.committed_words.extend(words[:agreed])
+        self.hypothesis = words[agreed:]
+
+        if agreed:
+            self.trim_window(words[agreed - 1][1])
+        elif len(self.audio_buffer) > self.max_window * self.sample_rate:
+            # Nothing stabilised inside the window: commit what we have so the
+            # window and the decode cost stay bounded.
+            if self.hypothesis:
+                self.committed_words.extend(self.hypothesis)
+                self.trim_window(self.hypothesis[-1][1])
+                self.hypothesis = []
+            else:
+                self.trim_window(self.buffer_offset + len(self.audio_buffer) / self.sample_rate - 1.0)
+        return self.text
+
+    def trim_window(self, phrase_time):
+        """
+        Drops the audio before the given phrase time from the window.
+        """
+        cut = int(round((phrase_time - self.buffer_offset) * self.sample_rate))
+        if cut <= 0:
+            return
+        self.audio_buffer = self.audio_buffer[cut:]
+        self.buffer_offset += cut / self.sample_rate
+
+    def finish(self):
+        """
+        Commits the tentative tail and ends the phrase.
+
+        Returns:
+            str: The full text of the phrase.
+        """
+        # Audio inserted after the last pass has not been decoded yet.
+        if len(self.audio_buffer) and (self.dirty or not self.hypothesis):
+            self.hypothesis = self.transcribe_window()
+        self.committed_words.extend(self.hypothesis)
+        self.hypothesis = []
+        text = self.committed_text
+        self.reset()
+        return text
+
+
+def normalize_word(word):
+    return re.sub(r"[^\w']", '', word.lower())
@@ -0,0 +1,203 @@
+import os
+import shutil
+import sys
+import threading
+from collections import deque
+from queue import Queue, Empty
+
+NOTICE = "notice"  # line_id of status messages shown below the transcript
+STOP = "stop"  # line_id that ends TerminalDisplay.run
+
+
+class TranscriptEvent:
+    """
+    A change to one line of a transcript.
+
+    Attributes:
+        line_id (int): Line that changed; None for the status footer, NOTICE for a message.
+        text (str): New text of the line.
+    """
+
+    def __init__(self, line_id, text):
+        self.line_id = line_id
+        self.text = text
+
+
+class TranscriptFeed:
+    """
+    TranscriptFeed carries transcript changes from the threads producing them
+    to whatever displays them, one event per changed line.
+    """
+
+    def __init__(self):
+        self.events = Queue()
+
+    def publish(self, line_id, text):
+        self.events.put(TranscriptEvent(line_id, text))
+
+    def get(self, timeout=None):
+        """
+        Waits for the next event; returns None on timeout.
+        """
+        try:
+            return self.events.get(timeout=timeout)
+        except Empty:
+            return None
+
+    def drain(self):
+        """
+        Returns every pending event without waiting, keeping only the latest
+        text of each line, in the order the lines were first published.
+        """
+        latest = {}
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except Empty:
+                break
+            latest[event.line_id] = event
+        return list(latest.values())
+
+
+class TerminalDisplay:
+    """
+    TerminalDisplay renders transcript events in the terminal. New lines are
+    printed once; when a line changes, the cursor moves up to it with ANSI
+    escapes and only that line and the ones below it are rewritten, instead of
+    clearing the screen and reprinting the whole transcript.
+
+    Because rows are counted, nothing else may write to the terminal while the
+    display runs; status messages go through notify(), which shows the latest
+    ones under the footer.
+
+    Attributes:
+        feed (TranscriptFeed): Source of events.
+        lines (list): Current text of every line, indexed by line id.
+        footer (str): Status line kept below the transcript.
+        notices (deque): Latest status messages, shown below the footer.
+        rendered_rows (list): Terminal rows each printed line occupies.
+        footer_rows (int): Terminal rows the printed footer and notices occupy.
+    """
+
+    active = None  # The running display notify() writes to
+
+    def __init__(self, feed, stream=None, max_notices=3):
+        self.feed = feed
+        self.stream = stream or sys.stdout
+        self.lines = []
+        self.footer = ''
+        self.notices = deque(maxlen=max_notices)
+        self.rendered_rows = []
+        self.footer_rows = 0
+        self.thread = None
+        if os.name == 'nt':
+            os.system('')  # Enables ANSI escape sequences in the Windows console
+
+    def start(self):
+        TerminalDisplay.active = self
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Draws the events already published, then ends the display thread.
+        """
+        if TerminalDisplay.active is self:
+            TerminalDisplay.active = None
+        if self.thread is not None:
+            self.feed.publish(STOP, None)
+            self.thread.join()
+            self.thread = None
+
+    def run(self):
+        while True:
+            event = self.feed.get()
+            if event.line_id == STOP:
+                break
+            self.apply(event)
+
+    def rows(self, text):
+        columns = max(1, shutil.get_terminal_size().columns)
+        return sum(max(1, -(-len(part) // columns)) for part in text.split('\n'))
+
+    def apply(self, event):
+        if event.line_id == NOTICE:
+            self.notices.append(event.text)
+            first = len(self.lines)
+        elif event.line_id is None:
+            if event.text == self.footer:
+                return
+            self.footer = event.text
+            first = len(self.lines)
+        else:
+            if event.line_id < len(self.lines) and self.lines[event.line_id] == event.text:
+                return
+            while len(self.lines) <= event.line_id:
+                self.lines.append('')
+            self.lines[event.line_id] = event.text
+            first = min(event.line_id, len(self.rendered_rows))
+
+        # Move up to the first changed line, clear everything below it and redraw from there.
+        up = sum(self.rendered_rows[first:]) + self.footer_rows
+        output = [f"\x1b[{up}F\x1b[J"] if up else []
+        output.extend(line + '\n' for line in self.lines[first:])
+        footer = '\n'.join(line for line in (self.footer, *self.notices) if line)
+        if footer:
+            output.append(footer + '\n')
+        self.stream.write(''.join(output))
+        self.stream.flush()
+
+        self.rendered_rows = self.rendered_rows[:first] + [self.rows(line) for line in self.lines[first:]]
+        self.footer_rows = self.rows(footer) if footer else 0
+
+
+def notify(message):
+    """
+    Shows a status message without corrupting a running TerminalDisplay: it
+    goes through the display while one is active, and is printed otherwise.
+    """
+    display = TerminalDisplay.active
+    if display is not None:
+        display.feed.publish(NOTICE, message)
+    else:
+        print(message)
+
+
+class TextboxDisplay:
+    """
+    TextboxDisplay applies transcript events to a CTkTextbox. Every line lives
+    under its own text tag, so a change replaces just that tagged range and a
+    new line is inserted at the end; the rest of the text is never touched.
+    A mark before each line keeps its place while the line is empty and its
+    tag covers no text.
+
+    Attributes:
+        textbox (CTkTextbox): Widget the transcript is shown in.
+        lines (set): Line ids already inserted.
+    """
+
+    def __init__(self, textbox, separator='\n\n'):
+        self.textbox = textbox
+        self.separator = separator
+        self.lines = set()
+
+    def apply(self, event):
+        if event.line_id in (None, NOTICE, STOP):
+            return
+        if not self.lines:
+            # Drop the placeholder text the first time real content arrives
+            self.textbox.delete("1.0", "end")
+        tag = f"line-{event.line_id}"
+        mark = f"line-{event.line_id}-start"
+        if event.line_id in self.lines:
+            ranges = self.textbox.tag_ranges(tag)
+            if ranges:
+                self.textbox.delete(ranges[0], ranges[-1])
+            self.textbox.insert(mark, event.text, tag)
+        else:
+            prefix = self.separator if self.lines else ''
+            self.textbox.insert("end", prefix)
+            self.textbox.mark_set(mark, "end-1c")
+            self.textbox.mark_gravity(mark, "left")
+            self.textbox.insert("end", event.text, tag)
+        self.lines.add(event.line_id)
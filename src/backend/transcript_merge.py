@@ -0,0 +1,87 @@
+import re
+from difflib import SequenceMatcher
+
+
+def normalize_words(words: list) -> list:
+    """
+    Lower-cases words and strips punctuation, so OCR noise around a word does
+    not stop it from matching.
+    """
+    return [re.sub(r"[^\w]", '', word.casefold()) for word in words]
+
+
+def merge_caption_words(buffer_words: list, new_words: list, min_overlap: int = 2, window: int = 200) -> list:
+    """
+    Aligns the words read from the current frame with the end of the existing
+    buffer and returns only the words that are new.
+
+    The exact case, where the frame starts with the last words of the buffer,
+    is checked first. Otherwise the frame is aligned against the buffer tail
+    with difflib, and everything after the last aligned run of at least
+    min_overlap words, and after the frame words that re-read the buffer words
+    following it, is new.
+
+    Parameters:
+    buffer_words (list): Words already in the transcript, oldest first.
+    new_words (list): Words read from the current frame.
+    min_overlap (int): Shortest run of matching words that counts as overlap.
+    window (int): Number of trailing buffer words to align against.
+
+    Returns:
+    list: The words of new_words not already in the buffer.
+    """
+    if not buffer_words:
+        return list(new_words)
+    if not new_words:
+        return []
+
+    tail = normalize_words(buffer_words[-window:])
+    new = normalize_words(new_words)
+
+    # Fast path: the frame continues exactly where the buffer ends.
+    for size in range(min(len(tail), len(new)), min_overlap - 1, -1):
+        if tail[-size:] == new[:size]:
+            return list(new_words[size:])
+
+    matcher = SequenceMatcher(None, tail, new, autojunk=False)
+    blocks = [block for block in matcher.get_matching_blocks() if block.size >= min_overlap]
+    if not blocks:
+        return list(new_words)
+    last = blocks[-1]
+    start = last.b + last.size
+    return list(new_words[start + count_reread(tail[last.a + last.size:], new[start:]):])
+
+
+def similar_words(a: str, b: str, threshold: float = 0.75) -> bool:
+    return a == b or SequenceMatcher(None, a, b).ratio() >= threshold
+
+
+def count_reread(tail: list, new: list) -> int:
+    """
+    Counts the leading words of new that re-read the buffer words after the
+    last aligned run, either exactly or with OCR noise or a caption correction.
+    Buffer words missing from the frame (scrolled off or not recognized) do
+    not hide new words.
+
+    Parameters:
+    tail (list): Normalized buffer words after the last aligned run.
+    new (list): Normalized frame words after the last aligned run.
+
+    Returns:
+    int: The number of words of new to skip.
+    """
+    if not tail or not new:
+        return 0
+    i = j = 0
+    # Exact matches anchor the alignment; words between them are revisions. A
+    # match preceded by more frame words than buffer words is new text that
+    # merely repeats a word.
+    for block in SequenceMatcher(None, tail, new, autojunk=False).get_matching_blocks():
+        if not block.size or block.b - j > block.a - i + 1:
+            break
+        i, j = block.a + block.size, block.b + block.size
+    # Past the last exact match, only words that still resemble the buffer are re-reads.
+    while i < len(tail) and j < len(new) and similar_words(tail[i], new[j]):
+        i += 1
+        j += 1
+    return j
@@ -0,0 +1,137 @@
+import threading
+from datetime import datetime
+from translation import SPEAKER_PATTERN
+
+
+class TranscriptSegment:
+    """
+    One speaker turn of the meeting transcript.
+
+    Attributes:
+        id (int): Stable identifier, assigned in order of arrival.
+        speaker_name (str): "Surname, Name" from the caption header, or None.
+        speaker_number (str): Number shown after the speaker name, or None.
+        timestamp (datetime): When the segment was first seen.
+        source_text (str): Caption text in the original language.
+        translated_text (str): Translation of source_text.
+        version (int): Incremented on every change, to invalidate the rendered Markdown.
+    """
+
+    def __init__(self, id, speaker_name=None, speaker_number=None, timestamp=None):
+        self.id = id
+        self.speaker_name = speaker_name
+        self.speaker_number = speaker_number
+        self.timestamp = timestamp or datetime.now()
+        self.source_text = ''
+        self.translated_text = ''
+        self.version = 0
+
+    @property
+    def speaker(self):
+        if self.speaker_name is None:
+            return None
+        return f"{self.speaker_name} ({self.speaker_number})"
+
+    def markdown(self):
+        text = self.translated_text.strip()
+        if self.speaker is None:
+            return text
+        return f"**{self.speaker}**\n{text}"
+
+
+class TranscriptStore:
+    """
+    TranscriptStore keeps the whole meeting as an append-only list of speaker
+    segments and renders it to Markdown incrementally: each segment's Markdown
+    is cached and only segments whose version changed are formatted again.
+    Live displays take the changed segments from render_segment(); the whole
+    document is only joined on request by render_markdown() and kept until
+    the next change.
+
+    Attributes:
+        segments (list): TranscriptSegment objects in order.
+    """
+
+    def __init__(self):
+        self.segments = []
+        self._rendered = []
+        self._markdown = ''
+        self._lock = threading.Lock()
+
+    def add_source_text(self, text: str, timestamp=None) -> list:
+        """
+        Adds newly read caption text. Text before the first speaker header
+        continues the last segment; every header starts a new segment.
+
+        Parameters:
+        text (str): New caption text in the original language.
+        timestamp (datetime): When the text was read.
+
+        Returns:
+        list: (segment, added_text) pairs for every segment that received text.
+        """
+        changes = []
+        with self._lock:
+            self._markdown = None
+            position = 0
+            for match in SPEAKER_PATTERN.finditer(text):
+                self._append_text(text[position:match.start()], changes, timestamp)
+                segment = TranscriptSegment(len(self.segments), match.group('name'), match.group('number'), timestamp)
+                self.segments.append(segment)
+                self._rendered.append(None)
+                changes.append((segment, ''))
+                position = match.end()
+            self._append_text(text[position:], changes, timestamp)
+        return [(segment, added.strip()) for segment, added in changes if added.strip()]
+
+    def _append_text(self, text, changes, timestamp):
+        text = text.strip()
+        if not text:
+            return
+        if not self.segments:
+            self.segments.append(TranscriptSegment(0, timestamp=timestamp))
+            self._rendered.append(None)
+        segment = self.segments[-1]
+        segment.source_text = f"{segment.source_text} {text}".strip()
+        segment.version += 1
+        if changes and changes[-1][0] is segment:
+            changes[-1] = (segment, f"{changes[-1][1]} {text}")
+        else:
+            changes.append((segment, text))
+
+    def append_translation(self, segment_id: int, text: str):
+        """
+        Appends translated text to a segment.
+        """
+        with self._lock:
+            self._markdown = None
+            segment = self.segments[segment_id]
+            segment.translated_text = f"{segment.translated_text} {text.strip()}".strip()
+            segment.version += 1
+
+    def render_segment(self, segment_id: int) -> str:
+        """
+        Returns a segment's Markdown, formatting it only if it changed.
+        """
+        with self._lock:
+            return self._render(segment_id)
+
+    def _render(self, segment_id):
+        segment = self.segments[segment_id]
+        cached = self._rendered[segment_id]
+        if cached is None or cached[0] != segment.version:
+            cached = (segment.version, segment.markdown())
+            self._rendered[segment_id] = cached
+        return cached[1]
+
+    def render_markdown(self) -> str:
+        """
+        Returns the whole transcript as Markdown, e.g. to export it. Unchanged
+        segments come from the cache and the document is reused until the
+        transcript changes.
+        """
+        with self._lock:
+            if self._markdown is None:
+                parts = [self._render(segment.id) for segment in self.segments]
+                self._markdown = '\n\n'.join(part for part in parts if part)
+            return self._markdown
@@ -1,7 +1,16 @@
 # Importing libraries
+import json
 import os
-from openai import AzureOpenAI
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import httpx
+from openai import AzureOpenAI, OpenAI
 import re
+from metrics import metrics
+from transcript_display import notify
 
 # Adding functionality
 languages_dict = {
@@ -62,6 +71,209 @@ languages_dict = {
     "Urdu": "ur"
 }
 
+AZURE_ENDPOINT = "https://genai-nexus.api.corpinter.net/apikey/"
+
+class ClientManager:
+    """
+    Keeps a single chat-completions client per process, backed by a pooled
+    keep-alive HTTP connection, and hands it out to every thread.
+
+    The client is built lazily on first use. By default it talks to the Azure
+    endpoint; when a base URL is configured (or TRANSLATOR_BASE_URL is set) it
+    talks to any OpenAI-compatible server instead, e.g. a local stub.
+
+    Attributes:
+        base_url (str): OpenAI-compatible endpoint, or None for Azure.
+        api_key (str): API key sent with every request.
+        api_version (str): Azure API version.
+        pool_size (int): Maximum number of pooled connections.
+        timeout (float): Request timeout in seconds.
+        connect_timeout (float): Connection timeout in seconds.
+        keepalive_expiry (float): Seconds an idle connection is kept open.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._client = None
+        self.configure()
+
+    def configure(self, base_url=None, api_key=None, api_version=None, pool_size=None, timeout=None,
+                  connect_timeout=5.0, keepalive_expiry=60.0):
+        """
+        Sets the connection parameters. The current client, if any, is closed
+        and a new one is built on the next request.
+        """
+        with self._lock:
+            self.base_url = base_url or os.getenv("TRANSLATOR_BASE_URL")
+            if self.base_url:
+                self.api_key = api_key or os.getenv("TRANSLATOR_API_KEY", "stub")
+            else:
+                self.api_key = api_key or os.getenv("NEXUS_API_KEY_DDQ")
+            self.api_version = api_version or os.getenv("OPENAI_API_VERSION_")
+            self.pool_size = pool_size if pool_size is not None else int(os.getenv("TRANSLATOR_POOL_SIZE", "10"))
+            self.timeout = timeout if timeout is not None else float(os.getenv("TRANSLATOR_TIMEOUT", "30"))
+            self.connect_timeout = connect_timeout
+            self.keepalive_expiry = keepalive_expiry
+            self._close()
+
+    def get_client(self):
+        """
+        Returns the shared client, building it on first use.
+        """
+        with self._lock:
+            if self._client is None:
+                self._client = self._build_client()
+            return self._client
+
+    def close(self):
+        """
+        Closes the shared client and its connection pool.
+        """
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def _build_client(self):
+        http_client = httpx.Client(
+            limits=httpx.Limits(max_connections=self.pool_size,
+                                max_keepalive_connections=self.pool_size,
+                                keepalive_expiry=self.keepalive_expiry),
+            timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout)
+        )
+        if self.base_url:
+            return OpenAI(base_url=self.base_url, api_key=self.api_key, http_client=http_client)
+        return AzureOpenAI(
+            api_version=self.api_version,
+            azure_endpoint=AZURE_ENDPOINT,
+            api_key=self.api_key,
+            http_client=http_client
+        )
+
+client_manager = ClientManager()
+
+def get_client():
+    """
+    Returns the process-wide chat-completions client.
+    """
+    return client_manager.get_client()
+
+class TranslationCache:
+    """
+    Bounded LRU cache of translation results with a TTL, hit/miss counters
+    and an optional SQLite store on disk that survives restarts.
+
+    Keys combine the source text with only its whitespace collapsed, the
+    target language code and the prompt type, so the same phrase translated by
+    different prompts or into different languages never collides. Punctuation
+    and case stay in the key: "Vienes?" and "Vienes." translate differently.
+
+    Attributes:
+        max_size (int): Maximum number of entries kept in memory.
+        ttl (float): Seconds an entry stays valid.
+        path (str): SQLite file backing the cache, or None for memory only.
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that had to go to the network.
+    """
+
+    def __init__(self, max_size=1024, ttl=3600.0, path=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS translations (key TEXT PRIMARY KEY, value TEXT, created REAL)")
+            self._db.commit()
+
+    @staticmethod
+    def make_key(text: str, language: str, prompt: str) -> str:
+        """
+        Builds the cache key for a source text, target language and prompt type.
+        """
+        normalized = ' '.join(text.split())
+        language_code = languages_dict.get(language, language)
+        return f"{prompt}\x1f{language_code}\x1f{normalized}"
+
+    def get(self, key: str):
+        """
+        Returns the cached value for the key, or None on a miss.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None and self._db is not None:
+                row = self._db.execute("SELECT value, created FROM translations WHERE key = ?", (key,)).fetchone()
+                if row is not None and now - row[1] <= self.ttl:
+                    entry = (row[0], row[1])
+                    self._store(key, entry)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, value: str):
+        """
+        Stores a value in memory and, when enabled, on disk.
+        """
+        entry = (value, time.time())
+        with self._lock:
+            self._store(key, entry)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO translations (key, value, created) VALUES (?, ?, ?)",
+                                 (key, value, entry[1]))
+                self._db.commit()
+
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        """
+        Returns the hit/miss counters and the current size.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries)
+            }
+
+    def clear(self):
+        """
+        Drops every entry from memory and disk and resets the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM translations")
+                self._db.commit()
+
+translation_cache = TranslationCache(
+    max_size=int(os.getenv("TRANSLATOR_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("TRANSLATOR_CACHE_TTL", "3600")),
+    path=os.getenv("TRANSLATOR_CACHE_PATH")
+)
+
+@metrics.timed("text_translation_seconds")
 def text_translation(text: str, output_language: str) -> str:
     """
     Translates the given text to the specified output language using Azure OpenAI.
@@ -73,43 +285,222 @@ def text_translation(text: str, output_language: str) -> str:
     Returns:
     str: The translated text.
     """
+    cache_key = translation_cache.make_key(text, output_language, "translation")
+    cached = translation_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
-    client = AzureOpenAI(
-            api_version=os.getenv("OPENAI_API_VERSION_"),
-            azure_endpoint="https://genai-nexus.api.corpinter.net/apikey/",
-            api_key=os.getenv("NEXUS_API_KEY_DDQ")
-        )
+    client = get_client()
+
+    chat_completion = client.chat.completions.create(
+        model="gpt4-turbo",
+        messages=translation_messages(text, output_language),
+        temperature=0.0
+    )
+    
+    try:
+        response = chat_completion.choices[0].message.content.strip()
+    except:
+        return ' '
+
+    if response:
+        translation_cache.put(cache_key, response)
+    return response
+
+@metrics.timed("multi_text_translation_seconds")
+def multi_text_translation(text: str, output_languages: list) -> dict:
+    """
+    Translates the given text into several languages with a single completion.
+
+    The model is asked for a JSON object keyed by language code, so adding a
+    language adds output tokens but no extra round trip. Languages already in
+    the cache are not requested again. If the response cannot be parsed or is
+    missing a language, the missing languages are translated with parallel
+    text_translation calls instead.
+
+    Parameters:
+    text (str): The text to be translated.
+    output_languages (list): Target language names, as keys of languages_dict.
+
+    Returns:
+    dict: The translated text for each requested language name.
+    """
+    unknown = [language for language in output_languages if language not in languages_dict]
+    if unknown:
+        raise ValueError(f"Unsupported output languages: {unknown}")
+
+    translations = {}
+    missing = []
+    for language in dict.fromkeys(output_languages):
+        cached = translation_cache.get(translation_cache.make_key(text, language, "translation"))
+        if cached is not None:
+            translations[language] = cached
+        else:
+            missing.append(language)
+
+    if len(missing) == 1:
+        translations[missing[0]] = text_translation(text, missing[0])
+        missing = []
+    elif missing:
+        try:
+            parsed = request_multi_translation(text, missing)
+        except Exception as e:
+            notify(f"Multi-target translation failed, translating per language: {e}")
+            parsed = {}
+        for language in list(missing):
+            response = parsed.get(languages_dict[language])
+            if isinstance(response, str) and response.strip():
+                translations[language] = response.strip()
+                translation_cache.put(translation_cache.make_key(text, language, "translation"), translations[language])
+                missing.remove(language)
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+            for language, response in zip(missing, executor.map(lambda language: text_translation(text, language), missing)):
+                translations[language] = response
+
+    return {language: translations[language] for language in output_languages}
+
+@metrics.timed("request_multi_translation_seconds")
+def request_multi_translation(text: str, output_languages: list) -> dict:
+    """
+    Requests translations into several languages as one JSON completion.
+
+    Returns:
+    dict: The parsed JSON object, keyed by language code.
+    """
+    client = get_client()
+    targets = ', '.join(f'"{languages_dict[language]}" ({language})' for language in output_languages)
 
     message_text = [{
         "role": "system",
         "content": f"""
         You are an expert translator providing real-time translations. Your objective is to translate as accurately as possible.
-        Return only the translated text, without any additional information or explanations.
+        Return only a JSON object, without any additional information or explanations.
 
         Input:
         Text to translate: "{text}"
-        Target language: "{output_language}"
+        Target languages: {targets}
 
         Task:
-        Translate the provided text into the target language with the utmost precision.
+        Translate the provided text into every target language with the utmost precision.
 
         Output:
+        A JSON object whose keys are the language codes above and whose values are the translated texts.
         """
     }]
 
     chat_completion = client.chat.completions.create(
         model="gpt4-turbo",
         messages=message_text,
-        temperature=0.0
+        temperature=0.0,
+        response_format={"type": "json_object"}
     )
-    
-    try:
-        response = chat_completion.choices[0].message.content.strip()
-    except:
-        response = ' '
-    
-    return response
 
+    parsed = json.loads(chat_completion.choices[0].message.content)
+    if not isinstance(parsed, dict):
+        raise ValueError("the response is not a JSON object")
+    return parsed
+
+def stream_text_translation(text: str, output_language: str):
+    """
+    Translates the given text like text_translation, yielding the translation
+    in pieces as the completion streams in.
+
+    Parameters:
+    text (str): The text to be translated.
+    output_language (str): The desired output language.
+
+    Yields:
+    str: Consecutive pieces of the translated text.
+    """
+    cache_key = translation_cache.make_key(text, output_language, "translation")
+    cached = translation_cache.get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+
+    client = get_client()
+    start = time.perf_counter()
+
+    stream = client.chat.completions.create(
+        model="gpt4-turbo",
+        messages=translation_messages(text, output_language),
+        temperature=0.0,
+        stream=True
+    )
+
+    parts = []
+    for chunk in stream:
+        # Azure sends a first chunk with no choices carrying the content filter results.
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            if not parts:
+                metrics.observe("stream_translation_first_token_seconds", time.perf_counter() - start)
+            parts.append(delta)
+            yield delta
+    metrics.observe("stream_translation_seconds", time.perf_counter() - start)
+
+    response = ''.join(parts).strip()
+    if response:
+        translation_cache.put(cache_key, response)
+
+def translation_messages(text: str, output_language: str) -> list:
+    """
+    Builds the chat messages used to translate text into the output language.
+    """
+    return [{
+        "role": "system",
+        "content": f"""
+        You are an expert translator providing real-time translations. Your objective is to translate as accurately as possible.
+        Return only the translated text, without any additional information or explanations.
+
+        Input:
+        Text to translate: "{text}"
+        Target language: "{output_language}"
+
+        Task:
+        Translate the provided text into the target language with the utmost precision.
+
+        Output:
+        """
+    }]
+
+SENTENCE_BOUNDARY = re.compile(r'[.!?;:…。！？]+["\'»)\]]*\s+')
+CLAUSE_BOUNDARY = re.compile(r'[,，]\s+')
+
+def iter_sentences(pieces, min_clause_length: int = 40):
+    """
+    Groups streamed text into sentences, so each one can be spoken as soon as
+    it is complete. Long sentences are also split at commas once a clause
+    reaches min_clause_length characters.
+
+    Parameters:
+    pieces (iterable): Text pieces, e.g. from stream_text_translation.
+    min_clause_length (int): Minimum clause length before splitting at a comma.
+
+    Yields:
+    str: Complete sentences or clauses, followed by whatever text remains.
+    """
+    buffer = ''
+    for piece in pieces:
+        buffer += piece
+        while True:
+            match = SENTENCE_BOUNDARY.search(buffer)
+            if match is None:
+                match = CLAUSE_BOUNDARY.search(buffer, min_clause_length)
+            if match is None:
+                break
+            sentence = buffer[:match.end()].strip()
+            buffer = buffer[match.end():]
+            if sentence:
+                yield sentence
+    if buffer.strip():
+        yield buffer.strip()
+
+@metrics.timed("text_transcript_seconds")
 def text_transcript(text: str) -> str:
     """
     Translates the given text to Spanish using Azure OpenAI.
@@ -120,11 +511,12 @@ def text_transcript(text: str) -> str:
     Returns:
     str: The translated text in Spanish.
     """
-    client = AzureOpenAI(
-            api_version=os.getenv("OPENAI_API_VERSION_"),
-            azure_endpoint="https://genai-nexus.api.corpinter.net/apikey/",
-            api_key=os.getenv("NEXUS_API_KEY_DDQ")
-        )
+    cache_key = translation_cache.make_key(text, "Spanish", "transcript")
+    cached = translation_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    client = get_client()
 
     message_text = [{
         "role": "system",
@@ -151,9 +543,197 @@ def text_transcript(text: str) -> str:
     )
     
     response = chat_completion.choices[0].message.content
+    if response:
+        translation_cache.put(cache_key, response)
     
     return response
 
+BATCH_MARKER = re.compile(r"<<<(\d+)>>>")
+
+class TranslationCoalescer:
+    """
+    Collects translation requests that arrive close together and sends them
+    to the model as one delimited batch prompt, then hands each caller its
+    own piece of the response through a Future.
+
+    A request that arrives while the coalescer is idle is sent on its own,
+    immediately, through text_translation or text_transcript. Requests that
+    arrive together, or while a batch is in flight, are grouped: once more
+    than one is pending the coalescer lingers for up to window seconds or
+    until max_batch requests are waiting. If the batch response cannot be
+    split back into its segments, the missing ones are translated one by one.
+    With concurrency above 1, up to that many batches are in flight at once,
+    for offline work where a large backlog is submitted in one go. close()
+    translates what is still pending and stops the worker thread.
+
+    Attributes:
+        output_language (str): Target language of every request.
+        prompt (str): "transcript" for text_transcript, "translation" for text_translation.
+        window (float): Seconds to wait for more requests once a burst is detected.
+        max_batch (int): Maximum number of segments per request.
+        concurrency (int): Maximum number of batches in flight.
+        requests (int): Completions sent so far.
+        segments (int): Segments translated so far.
+    """
+
+    def __init__(self, output_language="Spanish", prompt="transcript", window=0.05, max_batch=8, concurrency=1):
+        self.output_language = output_language
+        self.prompt = prompt
+        self.window = window
+        self.max_batch = max_batch
+        self.concurrency = concurrency
+        self._executor = ThreadPoolExecutor(max_workers=concurrency) if concurrency > 1 else None
+        self.requests = 0
+        self.segments = 0
+        self._pending = []
+        self._closed = False
+        self._counter_lock = threading.Lock()  # _dispatch runs on several threads when concurrency > 1
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, text: str) -> Future:
+        """
+        Queues a text for translation and returns the Future of its translation.
+        """
+        return self.submit_many([text])[0]
+
+    def submit_many(self, texts: list) -> list:
+        """
+        Queues several texts at once, so they are sent in the same batch.
+        """
+        futures = [Future() for _ in texts]
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("TranslationCoalescer is closed")
+            self._pending.extend(zip(texts, futures))
+            self._condition.notify()
+        return futures
+
+    def translate(self, text: str) -> str:
+        """
+        Translates one text, waiting for the result.
+        """
+        return self.submit(text).result()
+
+    def close(self):
+        """
+        Stops accepting texts and waits until the pending ones are translated.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                if 1 < len(self._pending) < self.max_batch:
+                    # Several requests are already waiting: give the burst a moment to finish.
+                    deadline = time.monotonic() + self.window
+                    while len(self._pending) < self.max_batch and not self._closed:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+            if self._executor is not None:
+                self._executor.submit(self._dispatch, batch)
+            else:
+                self._dispatch(batch)
+
+    def _translate_one(self, text):
+        if self.prompt == "transcript":
+            return text_transcript(text)
+        return text_translation(text, self.output_language)
+
+    def _dispatch(self, batch):
+        results = {}
+        missing = []
+        for index, (text, future) in enumerate(batch):
+            cached = translation_cache.get(translation_cache.make_key(text, self.output_language, self.prompt))
+            if cached is not None:
+                results[index] = cached
+            else:
+                missing.append(index)
+
+        try:
+            if len(missing) > 1:
+                self._count(requests=1)
+                translated = request_batch_translation([batch[index][0] for index in missing], self.output_language)
+                for position, index in enumerate(missing):
+                    response = translated.get(position + 1)
+                    if response:
+                        results[index] = response
+                        translation_cache.put(translation_cache.make_key(batch[index][0], self.output_language, self.prompt), response)
+        except Exception as e:
+            notify(f"Batch translation failed, translating one by one: {e}")
+
+        for index, (text, future) in enumerate(batch):
+            try:
+                if index not in results:
+                    self._count(requests=1)
+                    results[index] = self._translate_one(text)
+                future.set_result(results[index])
+            except Exception as e:
+                future.set_exception(e)
+        self._count(segments=len(batch))
+
+    def _count(self, requests=0, segments=0):
+        with self._counter_lock:
+            self.requests += requests
+            self.segments += segments
+
+@metrics.timed("request_batch_translation_seconds")
+def request_batch_translation(texts: list, output_language: str) -> dict:
+    """
+    Translates several segments with one completion. Each segment is sent
+    behind a numbered marker, and the response is split on the same markers.
+
+    Parameters:
+    texts (list): The segments to be translated.
+    output_language (str): The desired output language.
+
+    Returns:
+    dict: The translated text for each segment number, starting at 1.
+    """
+    client = get_client()
+    segments = '\n'.join(f"<<<{number}>>> {text}" for number, text in enumerate(texts, 1))
+
+    message_text = [{
+        "role": "system",
+        "content": f"""
+        You are an expert translator providing real-time translations. Your objective is to translate as accurately as possible while preserving the original tone and formalities.
+        Each segment below starts with a marker such as <<<1>>>. Translate every segment independently.
+
+        Input:
+        Segments to translate:
+        {segments}
+        Target language: "{output_language}"
+
+        Task:
+        Translate every segment into the target language with the utmost precision.
+        Return each translation after the same marker as its segment, in the same order, without any additional information.
+
+        Output:
+        """
+    }]
+
+    chat_completion = client.chat.completions.create(
+        model="gpt4-turbo",
+        messages=message_text,
+        temperature=0.0
+    )
+
+    parts = BATCH_MARKER.split(chat_completion.choices[0].message.content or '')
+    return {int(number): text.strip() for number, text in zip(parts[1::2], parts[2::2])}
+
 def organise_transcript(text: str) -> str:
     """
     Translates the given text to Spanish using Azure OpenAI and organises the transcript.
@@ -164,11 +744,7 @@ def organise_transcript(text: str) -> str:
     Returns:
     str: The translated text in Spanish.
     """
-    client = AzureOpenAI(
-        api_version=os.getenv("OPENAI_API_VERSION_"),
-        azure_endpoint="https://genai-nexus.api.corpinter.net/apikey/",
-        api_key=os.getenv("NEXUS_API_KEY_DDQ")
-    )
+    client = get_client()
         
     message_text = [{
         "role": "system",
@@ -214,11 +790,7 @@ def organise_buffer(buffer: str, text: str) -> str:
     Returns:
     str: The translated and organized transcript in Spanish.
     """
-    client = AzureOpenAI(
-        api_version=os.getenv("OPENAI_API_VERSION_"),
-        azure_endpoint="https://genai-nexus.api.corpinter.net/apikey/",
-        api_key=os.getenv("NEXUS_API_KEY_DDQ")
-    )
+    client = get_client()
     
     message_text = [{
         "role": "system",
@@ -251,6 +823,12 @@ def organise_buffer(buffer: str, text: str) -> str:
     
     return response
 
+# Speaker header as shown in Teams captions: "Surname[ Surname], Name (number)"
+SPEAKER_HEADER = r"[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?: [A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)*, [A-ZÁÉÍÓÚÑ][a-záéíóúñ]+ \(\d+\)"
+SPEAKER_PATTERN = re.compile(r"(?P<name>[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?: [A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)*, [A-ZÁÉÍÓÚÑ][a-záéíóúñ]+) \((?P<number>\d+)\)")
+# Pattern to match the names and messages
+TRANSCRIPT_PATTERN = re.compile(rf"({SPEAKER_HEADER})(.*?)(?=({SPEAKER_HEADER})|$)", re.DOTALL)
+
 def format_transcript_markdown(transcript: str) -> str:
     """
     Formats the transcript into Markdown based on the specified pattern.
@@ -261,9 +839,7 @@ def format_transcript_markdown(transcript: str) -> str:
     Returns:
     str: The formatted transcript in Markdown.
     """
-    # Pattern to match the names and messages
-    pattern = r"([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?: [A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)*, [A-ZÁÉÍÓÚÑ][a-záéíóúñ]+ \(\d+\))(.*?)(?=([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?: [A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)*, [A-ZÁÉÍÓÚÑ][a-záéíóúñ]+ \(\d+\))|$)"
-    matches = re.findall(pattern, transcript, re.DOTALL)
+    matches = TRANSCRIPT_PATTERN.findall(transcript)
     
     formatted_lines = []
 
@@ -1,23 +1,28 @@
 import argparse
-import os
+import time
 import numpy as np
 import speech_recognition as sr
-import whisper
-import torch
-from TTS.api import TTS
-from pydub import AudioSegment
-from io import BytesIO
 from datetime import datetime, timedelta
-from queue import Queue
-from time import sleep
 from sys import platform
+from concurrent.futures import Future
 import pyaudio
 
-from translation import text_translation
+from translation import TranslationCoalescer, stream_text_translation, iter_sentences
+from streaming_asr import StreamingTranscriber
+from decoding_state import DecodingSession
+from vad import VoiceActivityDetector
+from audio_buffer import AudioRingBuffer
+from pipeline import Pipeline, PipelineStage
+from playback import PlaybackEngine
+from model_registry import registry, get_asr_backend, get_tts_model, get_voice_profile
+from transcript_display import TranscriptFeed, TerminalDisplay, notify
+from metrics import metrics
+
+SPEAKER_WAV = r"C:\Users\DURANAS\Coding\real-time-translator\data\voice\sergio_voice.mp3"
 
 
 class RealTimeTranslator:
-    def __init__(self, model="tiny", non_english=True, output_language="German", energy_threshold=1000, record_timeout=3, phrase_timeout=3, default_microphone='pulse', output_device=0):
+    def __init__(self, model="tiny", non_english=True, output_language="German", energy_threshold=1000, record_timeout=3, phrase_timeout=3, default_microphone='pulse', output_device=0, streaming=False, use_vad=False, queue_size=4, speaker_wav=SPEAKER_WAV, voice_profile_path=None, asr_backend=None, asr_threads=None):
         self.model_name = model
         self.non_english = non_english
         self.output_language = output_language
@@ -25,6 +30,10 @@ class RealTimeTranslator:
         self.record_timeout = record_timeout
         self.phrase_timeout = phrase_timeout
         self.default_microphone = default_microphone
+        self.streaming = streaming
+        self.asr_backend = asr_backend
+        self.asr_threads = asr_threads
+        self.vad = VoiceActivityDetector() if use_vad else None
         if output_device == 0:
             self.output_device_name = 'CABLE Input (2- VB-Audio Virtua'
         else:
@@ -32,13 +41,23 @@ class RealTimeTranslator:
         
 
         self.phrase_time = None
-        self.data_queue = Queue()
+        self.audio_buffer = AudioRingBuffer(sample_rate=16000)
+        self.running = True  # Cleared by stop(), which may come before run() starts
+        self.last_capture = None
+        self.stop_listening = None
+        self.phrase_audio = []
         self.transcription = ['']
+        self.feed = TranscriptFeed()
+        self.display = TerminalDisplay(self.feed)
+        self.last_depths = None
 
+        # Models come from the process-wide registry, so restarting a session reuses them.
         if self.output_language == "German":
-            self.tts = TTS(model_name="tts_models/de/thorsten/tacotron2-DDC", progress_bar=False, gpu=True)
+            tts_name = "tts_models/de/thorsten/tacotron2-DDC"
         else:
-            self.tts = TTS(model_name="tts_models/en/ljspeech/tacotron2-DDC_ph", progress_bar=False, gpu=True)
+            tts_name = "tts_models/en/ljspeech/tacotron2-DDC_ph"
+        self.tts = get_tts_model(tts_name, gpu=True)
+        self.voice_profile = get_voice_profile(tts_name, speaker_wav, cache_path=voice_profile_path)
 
         self.recorder = sr.Recognizer()
         self.recorder.energy_threshold = energy_threshold
@@ -49,6 +68,15 @@ class RealTimeTranslator:
 
         self.p = pyaudio.PyAudio()
         self.output_device_index = self.find_output_device_index()
+        self.playback = PlaybackEngine(self.p, self.output_device_index)
+
+        # Phrases that pile up behind the translation stage are batched by the coalescer.
+        self.translator = TranslationCoalescer(output_language=self.output_language, prompt="translation")
+        # ASR runs in run(); translation and speech for earlier phrases overlap with it.
+        self.pipeline = Pipeline([
+            PipelineStage("translation", self.translate_phrase, maxsize=queue_size),
+            PipelineStage("speech", self.speak_phrase, maxsize=queue_size)
+        ])
         
 
     def setup_microphone(self):
@@ -70,7 +98,9 @@ class RealTimeTranslator:
     def load_audio_model(self):
         if self.model_name != "large" and not self.non_english:
             self.model_name = self.model_name + ".en"
-        self.audio_model = whisper.load_model(self.model_name)
+        self.audio_model = get_asr_backend(self.model_name, backend=self.asr_backend, threads=self.asr_threads)
+        self.session = DecodingSession(self.audio_model)
+        self.streamer = StreamingTranscriber(self.session)
 
     def find_output_device_index(self):
         for i in range(self.p.get_device_count()):
@@ -81,89 +111,177 @@ class RealTimeTranslator:
         raise ValueError(f"Output device '{self.output_device_name}' not found")
 
     def record_callback(self, _, audio: sr.AudioData) -> None:
+        # Converted straight into the preallocated buffer; the ASR loop is woken up
         data = audio.get_raw_data()
-        self.data_queue.put(data)
+        self.last_capture = time.perf_counter()
+        metrics.increment("voice_captured_audio_seconds", len(data) / 32000)
+        self.audio_buffer.write_pcm16(data)
 
     def start_listening(self):
         with self.source:
             self.recorder.adjust_for_ambient_noise(self.source)
-        self.recorder.listen_in_background(self.source, self.record_callback, phrase_time_limit=self.record_timeout)
+        self.stop_listening = self.recorder.listen_in_background(self.source, self.record_callback, phrase_time_limit=self.record_timeout)
         print("Model loaded.\n")
 
-    def process_audio(self, audio_data):
-        audio_np = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
-        result = self.audio_model.transcribe(audio_np, fp16=torch.cuda.is_available())
+    @metrics.timed("voice_process_audio_seconds")
+    def process_audio(self, audio_np, phrase_complete):
+        if self.vad is not None:
+            for segment in self.vad.feed(audio_np):
+                self.handle_speech(segment)
+        elif self.streaming:
+            if phrase_complete:
+                self.complete_phrase(self.streamer.finish())
+            self.streamer.insert_audio(audio_np)
+            self.set_line(-1, self.streamer.process_iter())
+        else:
+            text = self.transcribe_audio(audio_np)
+            self.session.commit(text)
+
+            if phrase_complete:
+                self.transcription.append('')
+                self.set_line(-1, text)
+                self.queue_phrase(len(self.transcription) - 1, text)
+            else:
+                self.set_line(-1, text)
+
+    def transcribe_audio(self, audio_np):
+        result = self.session.transcribe(audio_np)
         return result['text'].strip()
 
-    def synthesize_and_play_audio(self, text):
-        wav_buffer = BytesIO()
-        if self.output_language == "German":
-            # self.tts.tts_to_file(text=text, file_path=wav_buffer)
-            self.tts.tts_with_vc_to_file(
-                text,
-                speaker_wav=r"C:\Users\DURANAS\Coding\real-time-translator\data\voice\sergio_voice.mp3",
-                file_path=wav_buffer
-            )
+    def handle_speech(self, segment):
+        # Whisper only ever sees speech; the phrase ends where the VAD closes the segment.
+        if self.streaming:
+            self.streamer.insert_audio(segment.audio)
+            if not segment.complete:
+                self.set_line(-1, self.streamer.process_iter())
+                return
+            text = self.streamer.finish()
         else:
-            self.tts.tts_with_vc_to_file(
-                text,
-                speaker_wav=r"C:\Users\DURANAS\Coding\real-time-translator\data\voice\sergio_voice.mp3",
-                file_path=wav_buffer
-            )
-            
+            self.phrase_audio.append(segment.audio)
+            if not segment.complete:
+                return
+            text = self.transcribe_audio(np.concatenate(self.phrase_audio))
+            self.phrase_audio = []
+        self.complete_phrase(text)
 
-        wav_buffer.seek(0)
-        audio = AudioSegment.from_file(wav_buffer, format="wav")
+    def complete_phrase(self, text):
+        if not text:
+            return
+        self.session.commit(text)
+        self.set_line(-1, text)
+        self.queue_phrase(len(self.transcription) - 1, text)
+        self.transcription.append('')
 
-        try:
-            print(f"Synthesizing audio for text: {text}")
+    def queue_phrase(self, index, text):
+        # The phrase is traced from the moment its last audio was captured
+        metrics.begin((id(self), index), self.last_capture)
+        metrics.mark((id(self), index), "voice_asr")
+        if self.pipeline.queue_depths()["translation"]:
+            # Phrases are already waiting: translate it with them instead of streaming it alone
+            self.pipeline.put((index, self.translator.submit(text)))
+        else:
+            self.pipeline.put((index, text))
 
-            stream = self.p.open(format=self.p.get_format_from_width(audio.sample_width),
-                                 channels=audio.channels,
-                                 rate=audio.frame_rate,
-                                 output=True,
-                                 output_device_index=self.output_device_index)
+    def translate_phrase(self, phrase):
+        # Each sentence goes to the speech stage as soon as the LLM has streamed it;
+        # a phrase submitted to the coalescer arrives as the Future of its whole translation.
+        index, text = phrase
+        if isinstance(text, Future):
+            pieces = [text.result()]
+        else:
+            pieces = stream_text_translation(text, self.output_language)
+        sentences = []
+        for sentence in iter_sentences(pieces):
+            if not sentences:
+                metrics.mark((id(self), index), "voice_translation")
+            sentences.append(sentence)
+            self.set_line(index, ' '.join(sentences))
+            yield index, sentence
+
+    def set_line(self, index, text):
+        # Only the line that changed is sent to the display.
+        if index < 0:
+            index += len(self.transcription)
+        self.transcription[index] = text
+        self.feed.publish(index, text)
+
+    def publish_depths(self):
+        depths = self.queue_depths()
+        if depths != self.last_depths:
+            self.last_depths = depths
+            self.feed.publish(None, f"Queue depths: {depths}")
 
-            stream.write(audio.raw_data)
-            stream.stop_stream()
-            stream.close()
+    def speak_phrase(self, sentence):
+        index, text = sentence
+        self.synthesize_and_play_audio(text)
+        # The phrase ends once its first sentence is queued for playback
+        metrics.mark((id(self), index), "voice_speech")
+        metrics.finish((id(self), index), "voice_end_to_end")
+
+    def queue_depths(self):
+        depths = {"asr": self.audio_buffer.available}
+        depths.update(self.pipeline.queue_depths())
+        return depths
+
+    def synthesize_and_play_audio(self, text):
+        notify(f"Synthesizing audio for text: {text}")
+        with metrics.time("voice_synthesis_seconds"), registry.lock(self.tts):
+            wav, sample_rate = self.voice_profile.synthesize(text)
 
-            print("Audio successfully written to VB-Cable")
+        try:
+            # Queued on the persistent stream; playback overlaps synthesis of the next sentence.
+            self.playback.play(wav, sample_rate)
         except Exception as e:
-            print(f"Error opening stream: {e}")
+            notify(f"Error opening stream: {e}")
+
+    def finish_audio(self):
+        # Closes the phrase in progress once no more audio will arrive
+        if self.vad is not None:
+            segment = self.vad.flush()
+            if segment is not None:
+                self.handle_speech(segment)
+        elif self.streaming:
+            self.complete_phrase(self.streamer.finish())
+
+    def stop(self):
+        # Can be called from any thread; run() returns once the captured audio is processed
+        self.running = False
+        if self.stop_listening is not None:
+            self.stop_listening(wait_for_stop=False)
+        self.audio_buffer.close()
 
     def run(self):
         self.start_listening()
+        self.display.start()
+        metrics.start_server()
+        self.pipeline.start()
 
-        while True:
+        while self.running or self.audio_buffer.available:
             try:
+                # Wakes as soon as the capture callback writes audio; the timeout only bounds the wait
+                audio_np = self.audio_buffer.read(timeout=0.5)
+                if audio_np is None:
+                    continue
                 now = datetime.utcnow()
-                if not self.data_queue.empty():
-                    phrase_complete = False
-                    if self.phrase_time and now - self.phrase_time > timedelta(seconds=self.phrase_timeout):
-                        phrase_complete = True
-                    self.phrase_time = now
-
-                    audio_data = b''.join(self.data_queue.queue)
-                    self.data_queue.queue.clear()
-                    text = self.process_audio(audio_data)
-
-                    if phrase_complete:
-                        text = text_translation(text=text, output_language=self.output_language)
-                        self.transcription.append(text)
-                        self.synthesize_and_play_audio(text)
-                    else:
-                        self.transcription[-1] = text
-
-                    os.system('cls' if os.name == 'nt' else 'clear')
-                    for line in self.transcription:
-                        print(line)
-                    print('', end='', flush=True)
-                else:
-                    sleep(0.25)
+                phrase_complete = False
+                if self.phrase_time and now - self.phrase_time > timedelta(seconds=self.phrase_timeout):
+                    phrase_complete = True
+                self.phrase_time = now
+
+                self.process_audio(audio_np, phrase_complete)
+                self.publish_depths()
             except KeyboardInterrupt:
                 break
 
+        self.audio_buffer.close()
+        self.finish_audio()
+        self.pipeline.stop()
+        self.translator.close()
+        self.playback.wait_until_done()
+        self.playback.close()
+        registry.release(self.audio_model, self.tts, self.voice_profile)
+        self.display.stop()
+
         print("\n\nTranscription:")
         for line in self.transcription:
             print(line)
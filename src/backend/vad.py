@@ -0,0 +1,173 @@
+from collections import deque
+import numpy as np
+
+
+class SpeechSegment:
+    """
+    A piece of detected speech.
+
+    Attributes:
+        start (float): Stream time in seconds of the first sample.
+        end (float): Stream time in seconds after the last sample.
+        audio (np.ndarray): Float32 mono speech samples.
+        complete (bool): Whether this piece closes the phrase it belongs to.
+    """
+
+    def __init__(self, start, end, audio, complete):
+        self.start = start
+        self.end = end
+        self.audio = audio
+        self.complete = complete
+
+    def __repr__(self):
+        return f"SpeechSegment(start={self.start:.2f}, end={self.end:.2f}, complete={self.complete})"
+
+
+class VoiceActivityDetector:
+    """
+    VoiceActivityDetector classifies fixed-size frames as speech or non-speech
+    from their energy and zero-crossing rate, drops the non-speech frames and
+    emits the speech as segments with stream start and end times.
+
+    Frames are classified in one vectorized pass per chunk; an adaptive noise
+    floor keeps the energy threshold above steady background noise.
+
+    Attributes:
+        sample_rate (int): Sample rate of the incoming audio.
+        frame_length (int): Samples per analysis frame.
+        energy_threshold (float): Minimum frame energy in dBFS to count as speech.
+        noise_margin (float): dB above the noise floor a frame must reach to count as speech.
+        zcr_threshold (float): Maximum zero-crossing rate of a speech frame.
+        min_speech_frames (int): Consecutive speech frames needed to open a segment.
+        min_silence_frames (int): Consecutive non-speech frames needed to close a segment.
+        padding_frames (int): Non-speech frames kept around each segment.
+        noise_floor (float): Running estimate of the background energy in dBFS.
+        in_speech (bool): Whether a segment is currently open.
+    """
+
+    def __init__(self, sample_rate=16000, frame_ms=30, energy_threshold=-45.0, noise_margin=10.0,
+                 zcr_threshold=0.35, min_speech_ms=150, min_silence_ms=600, padding_ms=150):
+        """
+        Initializes the VoiceActivityDetector with the given parameters.
+        """
+        self.sample_rate = sample_rate
+        self.frame_length = int(sample_rate * frame_ms / 1000)
+        self.energy_threshold = energy_threshold
+        self.noise_margin = noise_margin
+        self.zcr_threshold = zcr_threshold
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.min_silence_frames = max(1, min_silence_ms // frame_ms)
+        self.padding_frames = padding_ms // frame_ms
+        self.reset()
+
+    def reset(self):
+        """
+        Forgets any open segment, buffered samples and the noise estimate.
+        """
+        self.noise_floor = self.energy_threshold - self.noise_margin
+        self.in_speech = False
+        self.frame_index = 0
+        self.speech_run = 0
+        self.pending_silence = []
+        self.remainder = np.zeros(0, dtype=np.float32)
+        self.preroll = deque(maxlen=self.padding_frames + self.min_speech_frames)
+        self.piece_frames = []
+        self.piece_start = 0
+
+    def classify(self, frames):
+        """
+        Classifies a (n_frames, frame_length) array of frames.
+
+        Returns:
+            np.ndarray: Boolean speech mask with one entry per frame.
+        """
+        energy = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / self.frame_length
+
+        threshold = max(self.energy_threshold, self.noise_floor + self.noise_margin)
+        speech = (energy > threshold) & (zcr < self.zcr_threshold)
+
+        background = energy[~speech]
+        if len(background):
+            self.noise_floor = 0.9 * self.noise_floor + 0.1 * float(np.median(background))
+        return speech
+
+    def feed(self, audio_np):
+        """
+        Feeds new audio and returns the speech it contained.
+
+        Speech belonging to a still-open segment is returned as an incomplete
+        piece, so callers can update partial results before the phrase ends.
+
+        Args:
+            audio_np (np.ndarray): Float32 mono audio at ``sample_rate``.
+
+        Returns:
+            list: SpeechSegment pieces in stream order.
+        """
+        audio_np = np.concatenate([self.remainder, audio_np.astype(np.float32, copy=False)])
+        n_frames = len(audio_np) // self.frame_length
+        self.remainder = audio_np[n_frames * self.frame_length:]
+        if not n_frames:
+            return []
+        frames = audio_np[:n_frames * self.frame_length].reshape(n_frames, self.frame_length)
+        speech = self.classify(frames)
+
+        segments = []
+        for frame, is_speech in zip(frames, speech):
+            if not self.in_speech:
+                self.preroll.append(frame)
+                self.speech_run = self.speech_run + 1 if is_speech else 0
+                if self.speech_run >= self.min_speech_frames:
+                    self.in_speech = True
+                    self.pending_silence = []
+                    self.piece_frames = list(self.preroll)
+                    self.piece_start = self.frame_index + 1 - len(self.piece_frames)
+                    self.preroll.clear()
+            elif is_speech:
+                # Silence inside a phrase is only kept once speech resumes.
+                self.piece_frames.extend(self.pending_silence)
+                self.piece_frames.append(frame)
+                self.pending_silence = []
+            else:
+                self.pending_silence.append(frame)
+                if len(self.pending_silence) >= self.min_silence_frames:
+                    self.piece_frames.extend(self.pending_silence[:self.padding_frames])
+                    self.pending_silence = []
+                    segments.append(self.emit_piece(complete=True))
+                    self.in_speech = False
+                    self.speech_run = 0
+            self.frame_index += 1
+
+        if self.in_speech and self.piece_frames:
+            segments.append(self.emit_piece(complete=False))
+        return segments
+
+    def flush(self):
+        """
+        Closes the open segment, if any, at the end of the stream.
+
+        Returns:
+            SpeechSegment: The closing piece, or None when no segment is open.
+        """
+        if not self.in_speech:
+            return None
+        self.piece_frames.extend(self.pending_silence[:self.padding_frames])
+        self.pending_silence = []
+        segment = self.emit_piece(complete=True)
+        self.in_speech = False
+        self.speech_run = 0
+        return segment
+
+    def emit_piece(self, complete):
+        frame_seconds = self.frame_length / self.sample_rate
+        if self.piece_frames:
+            audio = np.concatenate(self.piece_frames)
+        else:
+            audio = np.zeros(0, dtype=np.float32)
+        start = self.piece_start * frame_seconds
+        end = start + len(self.piece_frames) * frame_seconds
+        self.piece_start += len(self.piece_frames)
+        self.piece_frames = []
+        return SpeechSegment(start, end, audio, complete)
@@ -0,0 +1,114 @@
+import os
+import librosa
+import numpy as np
+import torch
+
+from transcript_display import notify
+
+VC_MODEL_NAME = "voice_conversion_models/multilingual/vctk/freevc24"
+
+
+class VoiceProfile:
+    """
+    VoiceProfile computes the speaker conditioning of the reference voice once
+    and reuses it for every synthesis, instead of decoding the reference file
+    and running the speaker encoder again inside each tts_with_vc call.
+
+    The conditioning is the FreeVC speaker embedding (or the reference mel
+    spectrogram for models without a speaker encoder). It can be stored on disk
+    next to the reference so later sessions skip even the first computation.
+
+    Attributes:
+        tts (TTS): Text-to-speech API object with a voice converter.
+        speaker_wav (str): Reference recording of the target voice.
+        cache_path (str): File the conditioning is stored in, or None.
+        conditioning (dict): Either {"g": embedding} or {"mel": spectrogram}.
+    """
+
+    def __init__(self, tts, speaker_wav, cache_path=None):
+        """
+        Initializes the VoiceProfile and computes or loads the conditioning.
+        """
+        self.tts = tts
+        self.speaker_wav = speaker_wav
+        self.cache_path = cache_path
+        if self.tts.voice_converter is None:
+            self.tts.load_vc_model_by_name(VC_MODEL_NAME)
+        self.vc_model = self.tts.voice_converter.vc_model
+        self.conditioning = None
+        if hasattr(self.vc_model, "extract_wavlm_features"):
+            self.conditioning = self.load() or self.compute()
+
+    @property
+    def sample_rate(self):
+        return self.tts.voice_converter.vc_config.audio.output_sample_rate
+
+    def signature(self):
+        stat = os.stat(self.speaker_wav)
+        return [os.path.abspath(self.speaker_wav), stat.st_size, stat.st_mtime]
+
+    def load(self):
+        """
+        Loads the conditioning from disk if it was computed from the same reference.
+        """
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        stored = torch.load(self.cache_path, map_location=self.vc_model.device)
+        if stored.get("signature") != self.signature():
+            return None
+        notify(f"Loaded voice profile from {self.cache_path}")
+        return stored["conditioning"]
+
+    @torch.no_grad()
+    def compute(self):
+        """
+        Runs the reference recording through the speaker encoder once.
+        """
+        config = self.vc_model.config
+        wav_tgt = self.vc_model.load_audio(self.speaker_wav).cpu().numpy()
+        wav_tgt, _ = librosa.effects.trim(wav_tgt, top_db=20)
+
+        if config.model_args.use_spk:
+            g_tgt = self.vc_model.enc_spk_ex.embed_utterance(wav_tgt)
+            conditioning = {"g": torch.from_numpy(g_tgt)[None, :, None].to(self.vc_model.device)}
+        else:
+            from TTS.vc.modules.freevc.mel_processing import mel_spectrogram_torch
+            wav_tgt = torch.from_numpy(wav_tgt).unsqueeze(0).to(self.vc_model.device)
+            mel_tgt = mel_spectrogram_torch(
+                wav_tgt,
+                config.audio.filter_length,
+                config.audio.n_mel_channels,
+                config.audio.input_sample_rate,
+                config.audio.hop_length,
+                config.audio.win_length,
+                config.audio.mel_fmin,
+                config.audio.mel_fmax,
+            )
+            conditioning = {"mel": mel_tgt.transpose(1, 2)}
+
+        if self.cache_path:
+            torch.save({"signature": self.signature(), "conditioning": conditioning}, self.cache_path)
+        return conditioning
+
+    @torch.no_grad()
+    def synthesize(self, text):
+        """
+        Synthesizes text and converts it to the profile's voice.
+
+        Args:
+            text (str): Text to speak.
+
+        Returns:
+            tuple: Float32 waveform and its sample rate.
+        """
+        if self.conditioning is None:
+            return np.asarray(self.tts.tts_with_vc(text, speaker_wav=self.speaker_wav), dtype=np.float32), self.sample_rate
+
+        wav = np.asarray(self.tts.tts(text), dtype=np.float32)
+        wav = librosa.resample(wav,
+                               orig_sr=self.tts.synthesizer.output_sample_rate,
+                               target_sr=self.vc_model.config.audio.input_sample_rate)
+        wav_src = self.vc_model.load_audio(wav)
+        c = self.vc_model.extract_wavlm_features(wav_src[None, :])
+        audio = self.vc_model.inference(c, **self.conditioning)
+        return audio[0][0].data.cpu().float().numpy(), self.sample_rate
@@ -0,0 +1,157 @@
+"""
+Stand-ins for the audio hardware, so the translators can run without a
+microphone, a Jabra headset or a VB-Cable device.
+
+FileAudioSource replays a WAV file in chunks, in real time or faster, and
+NullPyAudio replaces pyaudio.PyAudio with output streams that consume audio
+at the device rate and discard it.
+"""
+import threading
+import time
+import wave
+import numpy as np
+
+
+def load_wav(path, sample_rate=16000):
+    """
+    Reads a WAV file as mono int16 samples at the given sample rate.
+    """
+    with wave.open(path, "rb") as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+    if width != 2:
+        raise ValueError(f"{path}: only 16-bit PCM WAV files are supported")
+    audio = np.frombuffer(frames, dtype=np.int16).reshape(-1, channels).mean(axis=1)
+    if rate != sample_rate:
+        duration = len(audio) / rate
+        positions = np.arange(int(duration * sample_rate)) / sample_rate
+        audio = np.interp(positions, np.arange(len(audio)) / rate, audio)
+    return audio.astype(np.int16)
+
+
+class FileAudioSource:
+    """
+    FileAudioSource delivers the samples of a WAV file to a callback in fixed
+    chunks from its own thread, paced like a live capture device.
+
+    Attributes:
+        audio (np.ndarray): Int16 mono samples to replay.
+        sample_rate (int): Sample rate of the samples.
+        chunk_size (int): Samples per delivered chunk.
+        speed (float): Replay speed; 1.0 is real time, 0 delivers as fast as possible.
+        delivered (list): (audio_seconds, wall_time) after every chunk.
+        done (Event): Set once the whole file has been delivered.
+    """
+
+    def __init__(self, audio, sample_rate=16000, chunk_seconds=0.064, speed=1.0):
+        """
+        Initializes the FileAudioSource with the given parameters.
+        """
+        self.audio = audio
+        self.sample_rate = sample_rate
+        self.chunk_size = max(1, int(chunk_seconds * sample_rate))
+        self.speed = speed
+        self.delivered = []
+        self.done = threading.Event()
+        self.thread = None
+
+    @property
+    def duration(self):
+        return len(self.audio) / self.sample_rate
+
+    def start(self, callback):
+        """
+        Starts replaying; callback receives each chunk as int16 PCM bytes.
+        """
+        self.thread = threading.Thread(target=self.run, args=(callback,), daemon=True)
+        self.thread.start()
+
+    def run(self, callback):
+        start = time.perf_counter()
+        for offset in range(0, len(self.audio), self.chunk_size):
+            chunk = self.audio[offset:offset + self.chunk_size]
+            audio_end = (offset + len(chunk)) / self.sample_rate
+            if self.speed > 0:
+                # A live device delivers a chunk only once all of it has been recorded.
+                delay = start + audio_end / self.speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            callback(chunk.tobytes())
+            self.delivered.append((audio_end, time.perf_counter()))
+        self.done.set()
+
+    def last_delivery(self):
+        """
+        Returns the wall time of the most recent chunk, or None before the first one.
+        """
+        return self.delivered[-1][1] if self.delivered else None
+
+
+class NullStream:
+    """
+    Output stream that pulls audio from the callback at the device rate and
+    discards it, counting the frames played.
+    """
+
+    def __init__(self, rate, frames_per_buffer=1024, stream_callback=None, **kwargs):
+        self.rate = rate
+        self.frames_per_buffer = frames_per_buffer
+        self.callback = stream_callback
+        self.frames_played = 0
+        self.active = False
+        self.thread = None
+
+    def start_stream(self):
+        self.active = True
+        if self.callback is not None:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def run(self):
+        period = self.frames_per_buffer / self.rate
+        next_time = time.perf_counter()
+        while self.active:
+            self.callback(None, self.frames_per_buffer, None, 0)
+            self.frames_played += self.frames_per_buffer
+            next_time += period
+            time.sleep(max(0.0, next_time - time.perf_counter()))
+
+    def write(self, data):
+        self.frames_played += len(data) // 2
+
+    def is_active(self):
+        return self.active
+
+    def stop_stream(self):
+        self.active = False
+        if self.thread is not None:
+            self.thread.join()
+
+    def close(self):
+        self.stop_stream()
+
+
+class NullPyAudio:
+    """
+    Replacement for pyaudio.PyAudio with one output device that discards audio.
+    """
+
+    def __init__(self):
+        self.streams = []
+
+    def get_device_count(self):
+        return 1
+
+    def get_device_info_by_index(self, index):
+        return {"index": index, "name": "Null output", "maxInputChannels": 1, "maxOutputChannels": 1}
+
+    def open(self, rate=16000, frames_per_buffer=1024, stream_callback=None, **kwargs):
+        stream = NullStream(rate, frames_per_buffer, stream_callback)
+        self.streams.append(stream)
+        return stream
+
+    def terminate(self):
+        for stream in self.streams:
+            stream.close()
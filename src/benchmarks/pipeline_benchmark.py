@@ -0,0 +1,336 @@
+"""
+Replays recorded WAV files through RealTimeTranscript or RealTimeTranslator
+without audio hardware or the Azure endpoint, and reports how the pipeline
+keeps up with live speech.
+
+The microphone or speaker capture is replaced by a file source paced like a
+live device, audio output by a null device, and the translation endpoint by
+a local stub server with a configurable latency. Whisper and TTS are the
+real models, so their cost is measured as deployed.
+
+Reported per file and overall:
+    * end-to-end latency percentiles, from the last captured chunk of a phrase
+      to its translation (and, for the translator, to its first synthesized audio)
+    * ASR real-time factor: Whisper compute time over audio seconds decoded
+    * dropped audio and the largest backlog of captured audio waiting for ASR
+    * in the JSON output, the per-stage histograms recorded by the metrics module
+
+Usage:
+    python src/benchmarks/pipeline_benchmark.py recording.wav [more.wav ...] [--target transcript]
+        [--speed 1.0] [--model tiny] [--asr-backend whisper-int8] [--no-vad] [--streaming] [--latency 0.3]
+        [--speaker-wav voice.wav] [--json results.json]
+
+The replayed audio arrives in continuous chunks, so phrases are split by the
+voice activity detector by default. With --no-vad, --target transcript closes
+phrases after a stretch of silence, while --target translator relies on its
+phrase timer, which continuous audio never lets expire, so it completes no
+phrases. --target translator needs --speaker-wav for the cloned voice.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import threading
+import time
+import numpy as np
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(SRC_DIR, "backend"))
+
+from fake_devices import FileAudioSource, NullPyAudio, load_wav
+from stub_llm_server import StubChatServer
+
+SAMPLE_RATE = 16000
+
+
+class TimedModel:
+    """
+    Wraps a Whisper model and adds up the time spent in transcribe() and
+    language detection, and the seconds of audio it was given.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.compute_seconds = 0.0
+        self.audio_seconds = 0.0
+        self.calls = 0
+
+    def transcribe(self, audio, **kwargs):
+        start = time.perf_counter()
+        result = self.model.transcribe(audio, **kwargs)
+        self.compute_seconds += time.perf_counter() - start
+        self.audio_seconds += len(audio) / SAMPLE_RATE
+        self.calls += 1
+        return result
+
+    def detect_language(self, audio):
+        start = time.perf_counter()
+        result = self.model.detect_language(audio)
+        self.compute_seconds += time.perf_counter() - start
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+class PhraseTimes:
+    """
+    Collects the timestamps of every phrase as it moves through the pipeline.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.lock = threading.Lock()
+        self.captured = {}
+        self.translated = {}
+        self.first_audio = {}
+        self.max_backlog = 0.0
+        self.max_depths = {}
+
+    def mark(self, times, index):
+        with self.lock:
+            times.setdefault(index, time.perf_counter())
+
+    def phrase_queued(self, index):
+        # The reference point is the newest audio delivered when the phrase left ASR.
+        with self.lock:
+            self.captured.setdefault(index, self.source.last_delivery() or time.perf_counter())
+
+    def sample_depths(self, backlog_seconds, depths):
+        with self.lock:
+            self.max_backlog = max(self.max_backlog, backlog_seconds)
+            for name, depth in depths.items():
+                self.max_depths[name] = max(self.max_depths.get(name, 0), depth)
+
+    def latencies(self, times):
+        return [times[index] - self.captured[index] for index in times if index in self.captured]
+
+
+class ReplayMixin:
+    """
+    Replaces the capture device with a FileAudioSource and records phrase
+    timings; mixed into the translator classes below.
+    """
+
+    def attach(self, source, times):
+        self.replay_source = source
+        self.times = times
+        self.audio_model = TimedModel(self.audio_model)
+        self.session.audio_model = self.audio_model
+        self.display.stream = open(os.devnull, "w")
+        pipeline_put = self.pipeline.put
+
+        def put(item):
+            self.times.phrase_queued(item[0])
+            pipeline_put(item)
+        self.pipeline.put = put
+
+    def publish_depths(self):
+        depths = self.queue_depths()
+        self.times.sample_depths(self.audio_buffer.available / SAMPLE_RATE, depths)
+        super().publish_depths()
+
+
+def replay_classes():
+    """
+    Builds the replay subclasses. The translator modules are imported here so
+    that PyAudio can be replaced before they open any device.
+    """
+    import pyaudio
+    pyaudio.PyAudio = NullPyAudio
+    import speech_recognition as sr
+    from conversation_transcript import RealTimeTranscript
+    from user_translation import RealTimeTranslator
+
+    class ReplayTranscript(ReplayMixin, RealTimeTranscript):
+        def find_valid_input_device(self):
+            return 0
+
+        def setup_speaker(self):
+            pass
+
+        def start_listening(self):
+            self.replay_source.start(lambda data: self.record_callback(data, len(data) // 2, None, 0))
+
+        def translate_phrase(self, phrase):
+            super().translate_phrase(phrase)
+            self.times.mark(self.times.translated, phrase[0])
+
+    class ReplayTranslator(ReplayMixin, RealTimeTranslator):
+        def setup_microphone(self):
+            pass
+
+        def find_output_device_index(self):
+            return 0
+
+        def start_listening(self):
+            self.replay_source.start(lambda data: self.record_callback(None, sr.AudioData(data, SAMPLE_RATE, 2)))
+
+        def translate_phrase(self, phrase):
+            yield from super().translate_phrase(phrase)
+            self.times.mark(self.times.translated, phrase[0])
+
+        def speak_phrase(self, sentence):
+            super().speak_phrase(sentence)
+            self.times.mark(self.times.first_audio, sentence[0])
+
+    return {"transcript": ReplayTranscript, "translator": ReplayTranslator}
+
+
+def percentiles(values):
+    if not values:
+        return None
+    values = np.asarray(values)
+    return {
+        "count": len(values),
+        "p50": float(np.percentile(values, 50)),
+        "p90": float(np.percentile(values, 90)),
+        "p99": float(np.percentile(values, 99)),
+        "max": float(values.max())
+    }
+
+
+def run_file(translator_class, path, args, stub):
+    from translation import translation_cache
+    from model_registry import registry
+
+    source = FileAudioSource(load_wav(path, SAMPLE_RATE), SAMPLE_RATE, args.chunk, args.speed)
+    times = PhraseTimes(source)
+    options = {"model": args.model, "streaming": args.streaming, "use_vad": args.vad,
+               "asr_backend": args.asr_backend, "asr_threads": args.threads}
+    if args.target == "translator":
+        options["output_language"] = args.language
+        options["speaker_wav"] = args.speaker_wav
+    translator = translator_class(**options)
+    translator.attach(source, times)
+
+    # Every phrase goes to the endpoint; nothing is answered from an earlier run.
+    translation_cache.clear()
+    requests_before = stub.requests if stub else 0
+
+    def stop_when_replayed():
+        source.done.wait()
+        translator.stop()
+    threading.Thread(target=stop_when_replayed, daemon=True).start()
+
+    start = time.perf_counter()
+    translator.run()
+    wall = time.perf_counter() - start
+    # run() hands back the models it holds; the timing wrapper hides the ASR model from the registry.
+    registry.release(translator.audio_model.model)
+
+    model = translator.audio_model
+    result = {
+        "file": path,
+        "audio_seconds": source.duration,
+        "wall_seconds": wall,
+        "phrases": len(times.captured),
+        "translation_latency": percentiles(times.latencies(times.translated)),
+        "asr_rtf": model.compute_seconds / model.audio_seconds if model.audio_seconds else None,
+        "asr_audio_seconds": model.audio_seconds,
+        "dropped_seconds": translator.audio_buffer.dropped / SAMPLE_RATE,
+        "max_backlog_seconds": times.max_backlog,
+        "max_queue_depths": times.max_depths,
+        "llm_requests": (stub.requests - requests_before) if stub else None
+    }
+    if args.target == "translator":
+        result["first_audio_latency"] = percentiles(times.latencies(times.first_audio))
+    return result, times
+
+
+def print_result(name, result):
+    print(f"\n{name}")
+    print(f"  audio {result['audio_seconds']:.1f} s replayed in {result['wall_seconds']:.1f} s, {result['phrases']} phrases")
+    for key in ("translation_latency", "first_audio_latency"):
+        stats = result.get(key)
+        if stats:
+            print(f"  {key.replace('_', ' ')}: p50 {stats['p50'] * 1000:.0f} ms, p90 {stats['p90'] * 1000:.0f} ms, "
+                  f"p99 {stats['p99'] * 1000:.0f} ms, max {stats['max'] * 1000:.0f} ms")
+    if result["asr_rtf"] is not None:
+        print(f"  ASR real-time factor: {result['asr_rtf']:.3f} over {result['asr_audio_seconds']:.1f} s decoded")
+    print(f"  dropped audio: {result['dropped_seconds']:.2f} s, max backlog: {result['max_backlog_seconds']:.2f} s")
+    print(f"  max queue depths: {result['max_queue_depths']}")
+    if result["llm_requests"] is not None:
+        print(f"  translation requests: {result['llm_requests']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline latency benchmark for the translator pipeline.")
+    parser.add_argument("inputs", nargs="+", help="WAV files or directories of WAV files")
+    parser.add_argument("--target", choices=["transcript", "translator"], default="transcript",
+                        help="RealTimeTranscript (speakers to Spanish text) or RealTimeTranslator (microphone to speech)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed; 1.0 is real time, 0 is as fast as possible")
+    parser.add_argument("--chunk", type=float, default=0.064, help="Seconds of audio per captured chunk")
+    parser.add_argument("--model", default="tiny", help="Whisper model name")
+    parser.add_argument("--asr-backend", choices=["whisper", "whisper-int8", "faster-whisper"],
+                        help="Speech recognizer; defaults to ASR_BACKEND or whisper")
+    parser.add_argument("--threads", type=int, help="Intra-op CPU threads for the recognizer")
+    parser.add_argument("--vad", action=argparse.BooleanOptionalAction, default=True,
+                        help="Split phrases with the voice activity detector (default); --no-vad uses the phrase timer")
+    parser.add_argument("--streaming", action="store_true", help="Decode phrases incrementally")
+    parser.add_argument("--language", default="German", help="Output language for --target translator")
+    parser.add_argument("--speaker-wav", help="Reference voice for --target translator (required there)")
+    parser.add_argument("--latency", type=float, default=0.3, help="Stub endpoint latency in seconds")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="Stub delay between streamed words")
+    parser.add_argument("--base-url", help="Use this OpenAI-compatible endpoint instead of the stub")
+    parser.add_argument("--json", help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    paths = []
+    for item in args.inputs:
+        paths.extend(sorted(glob.glob(os.path.join(item, "*.wav"))) if os.path.isdir(item) else [item])
+    if not paths:
+        parser.error("no WAV files found")
+    if args.target == "translator" and not args.speaker_wav:
+        parser.error("--target translator requires --speaker-wav")
+
+    from translation import client_manager
+    from metrics import metrics
+    metrics.enabled = True
+    stub = None
+    if args.base_url:
+        client_manager.configure(base_url=args.base_url)
+    else:
+        stub = StubChatServer(latency=args.latency, token_delay=args.token_delay).start()
+        client_manager.configure(base_url=stub.url)
+
+    translator_class = replay_classes()[args.target]
+    results = []
+    all_times = []
+    for path in paths:
+        result, times = run_file(translator_class, path, args, stub)
+        results.append(result)
+        all_times.append(times)
+        print_result(os.path.basename(path), result)
+
+    audio = sum(result["asr_audio_seconds"] for result in results)
+    compute = sum(result["asr_rtf"] * result["asr_audio_seconds"] for result in results if result["asr_rtf"] is not None)
+    overall = {
+        "files": len(results),
+        "audio_seconds": sum(result["audio_seconds"] for result in results),
+        "translation_latency": percentiles([value for times in all_times for value in times.latencies(times.translated)]),
+        "asr_rtf": compute / audio if audio else None,
+        "dropped_seconds": sum(result["dropped_seconds"] for result in results),
+        "max_backlog_seconds": max(result["max_backlog_seconds"] for result in results)
+    }
+    if args.target == "translator":
+        overall["first_audio_latency"] = percentiles([value for times in all_times for value in times.latencies(times.first_audio)])
+    if len(results) > 1:
+        stats = overall["translation_latency"]
+        print(f"\nOverall: {overall['files']} files, {overall['audio_seconds']:.1f} s of audio")
+        if stats:
+            print(f"  translation latency: p50 {stats['p50'] * 1000:.0f} ms, p90 {stats['p90'] * 1000:.0f} ms, p99 {stats['p99'] * 1000:.0f} ms")
+        if overall["asr_rtf"] is not None:
+            print(f"  ASR real-time factor: {overall['asr_rtf']:.3f}")
+        print(f"  dropped audio: {overall['dropped_seconds']:.2f} s, max backlog: {overall['max_backlog_seconds']:.2f} s")
+
+    if stub:
+        stub.stop()
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"settings": vars(args), "files": results, "overall": overall, "stages": metrics.snapshot()}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Measures how long each module takes to import and how long the desktop app
+takes to show its first frame. Every measurement runs in a fresh interpreter
+so earlier imports do not hide the cost of later ones.
+
+Usage:
+    python src/benchmarks/startup_benchmark.py [--repeat 3] [--json results.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(SRC_DIR, "backend")
+FRONTEND_DIR = os.path.join(SRC_DIR, "frontend")
+
+MODULES = [
+    "translation",
+    "streaming_asr",
+    "vad",
+    "pipeline",
+    "playback",
+    "voice_profile",
+    "model_registry",
+    "conversation_transcript",
+    "user_translation",
+    "screen_transcript",
+    "app",
+]
+
+IMPORT_SNIPPET = """
+import sys, time
+sys.path[:0] = {paths!r}
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+FIRST_FRAME_SNIPPET = """
+import sys, time
+sys.path[:0] = {paths!r}
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+window = app.App()
+window.update()
+shown = time.perf_counter()
+window.destroy()
+print(imported - start, shown - start)
+"""
+
+
+def run_snippet(snippet):
+    """
+    Runs a snippet in a fresh interpreter and returns its printed numbers,
+    or the last line of the error when it fails.
+    """
+    result = subprocess.run([sys.executable, "-c", snippet], capture_output=True, text=True)
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines() or ["unknown error"]
+        return None, lines[-1]
+    return [float(value) for value in result.stdout.strip().splitlines()[-1].split()], None
+
+
+def measure(snippet, repeat):
+    samples = []
+    for _ in range(repeat):
+        values, error = run_snippet(snippet)
+        if error:
+            return None, error
+        samples.append(values)
+    return [statistics.median(column) for column in zip(*samples)], None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup-time benchmark for the translator app.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the median is reported.")
+    parser.add_argument("--json", help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    paths = [BACKEND_DIR, FRONTEND_DIR]
+    results = {"imports": {}, "first_frame": None}
+
+    print(f"{'module':<26}{'import (ms)':>14}")
+    for module in MODULES:
+        values, error = measure(IMPORT_SNIPPET.format(paths=paths, module=module), args.repeat)
+        if error:
+            results["imports"][module] = {"error": error}
+            print(f"{module:<26}{'failed':>14}  {error}")
+        else:
+            results["imports"][module] = {"seconds": values[0]}
+            print(f"{module:<26}{values[0] * 1000:>14.1f}")
+
+    values, error = measure(FIRST_FRAME_SNIPPET.format(paths=paths), args.repeat)
+    if error:
+        results["first_frame"] = {"error": error}
+        print(f"\nFirst frame: failed  {error}")
+    else:
+        results["first_frame"] = {"import_seconds": values[0], "shown_seconds": values[1]}
+        print(f"\nFirst frame: app imported in {values[0] * 1000:.1f} ms, window shown after {values[1] * 1000:.1f} ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Local stand-in for the chat-completions endpoint, so translation can be
+benchmarked without network access or the corporate Azure deployment.
+
+The server answers every request after a configurable latency with a fake
+translation of the text found in the prompt: "[language] original text".
+Streaming requests are answered word by word as server-sent events, batch
+prompts keep their <<<n>>> markers and JSON requests get a JSON object.
+
+Usage:
+    python src/benchmarks/stub_llm_server.py [--port 8765] [--latency 0.3] [--token-delay 0.02]
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TEXT_PATTERN = re.compile(r'(?:Text to translate|Transcript): "(.*?)"\n', re.DOTALL)
+LANGUAGE_PATTERN = re.compile(r'Target language: "(.*?)"')
+LANGUAGES_PATTERN = re.compile(r'"(\w+)" \(\w+\)')
+SEGMENT_PATTERN = re.compile(r"^\s*<<<(\d+)>>> (.*)$", re.MULTILINE)
+
+
+def fake_translation(prompt, json_mode=False):
+    """
+    Builds the reply the real model would give to a translation prompt.
+    """
+    language = LANGUAGE_PATTERN.search(prompt)
+    language = language.group(1) if language else "Spanish"
+    segments = SEGMENT_PATTERN.findall(prompt)
+    if segments:
+        return '\n'.join(f"<<<{number}>>> [{language}] {text.strip()}" for number, text in segments)
+    match = TEXT_PATTERN.search(prompt)
+    text = match.group(1).strip() if match else prompt.strip()
+    if json_mode:
+        return json.dumps({code: f"[{code}] {text}" for code in LANGUAGES_PATTERN.findall(prompt)})
+    return f"[{language}] {text}"
+
+
+class StubChatServer:
+    """
+    StubChatServer serves /v1/chat/completions from a background thread.
+
+    Attributes:
+        latency (float): Seconds before the first byte of every response.
+        token_delay (float): Seconds between streamed words.
+        requests (int): Requests answered so far.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.3, token_delay=0.02):
+        """
+        Initializes the StubChatServer; port 0 picks a free port.
+        """
+        self.latency = latency
+        self.token_delay = token_delay
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self.make_handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                if not self.path.endswith("/chat/completions"):
+                    self.send_error(404)
+                    return
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                with stub.lock:
+                    stub.requests += 1
+                prompt = '\n'.join(message.get("content", '') for message in body.get("messages", []))
+                json_mode = (body.get("response_format") or {}).get("type") == "json_object"
+                content = fake_translation(prompt, json_mode)
+                time.sleep(stub.latency)
+                if body.get("stream"):
+                    self.stream_reply(body.get("model", "stub"), content)
+                else:
+                    self.reply(body.get("model", "stub"), content)
+
+            def reply(self, model, content):
+                payload = json.dumps({
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def stream_reply(self, model, content):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for index, word in enumerate(re.findall(r"\S+\s*", content)):
+                    if index:
+                        time.sleep(stub.token_delay)
+                    self.send_event(json.dumps({
+                        "id": "chatcmpl-stub",
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}]
+                    }))
+                self.send_event("[DONE]")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def send_event(self, data):
+                event = f"data: {data}\n\n".encode()
+                self.wfile.write(f"{len(event):x}\r\n".encode() + event + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve fake chat completions for benchmarks.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds before each response")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="Seconds between streamed words")
+    args = parser.parse_args()
+
+    stub = StubChatServer(port=args.port, latency=args.latency, token_delay=args.token_delay).start()
+    print(f"Stub chat completions at {stub.url} (set TRANSLATOR_BASE_URL to use it)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -8,8 +8,8 @@ import time
 import sys
 print(os.path.join(os.path.dirname(os.path.abspath(__file__)),"backend"))
 sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),"backend"))
-from user_translation import RealTimeTranslator
-from screen_transcript import ScreenCapture
+# The backend engines (torch, whisper, TTS, easyocr) are imported on first use, not here.
+from transcript_display import TextboxDisplay
 
 customtkinter.set_appearance_mode("Dark")  # Modes: "System" (standard), "Dark", "Light"
 customtkinter.set_default_color_theme("dark-blue")  # Themes: "blue" (standard), "green", "dark-blue"
@@ -18,10 +18,11 @@ class App(customtkinter.CTk):
     def __init__(self):
         super().__init__()
 
+        self.translator = None
         self.translator_thread = None
         self.translator_running = False
 
-        self.screen_capture = ScreenCapture()
+        self.screen_capture = None
 
         # configure window
         self.title("Real-Time MS Teams translator")
@@ -42,6 +43,12 @@ class App(customtkinter.CTk):
         self.sidebar_button_1.grid(row=1, column=0, padx=20, pady=10)
         self.sidebar_button_2 = customtkinter.CTkButton(self.sidebar_frame, text="Transcript", command=self.sidebar_button_event)
         self.sidebar_button_2.grid(row=2, column=0, padx=20, pady=10)
+        self.loading_label = customtkinter.CTkLabel(self.sidebar_frame, text="", anchor="w")
+        self.loading_label.grid(row=3, column=0, padx=20, pady=(10, 0))
+        self.loading_bar = customtkinter.CTkProgressBar(self.sidebar_frame, mode="indeterminate", width=140)
+        self.loading_bar.grid(row=4, column=0, padx=20, pady=(0, 10), sticky="n")
+        self.loading_label.grid_remove()
+        self.loading_bar.grid_remove()
         self.appearance_mode_label = customtkinter.CTkLabel(self.sidebar_frame, text="Appearance Mode:", anchor="w")
         self.appearance_mode_label.grid(row=5, column=0, padx=20, pady=(10, 0))
         self.appearance_mode_optionemenu = customtkinter.CTkOptionMenu(self.sidebar_frame, values=["Light", "Dark", "System"],
@@ -77,6 +84,7 @@ class App(customtkinter.CTk):
         self.scaling_optionemenu.set("100%")
         self.textbox.insert("0.0", "CTkTextbox\n\n" + "Lorem ipsum dolor sit amet, consetetur sadipscing elitr, sed diam nonumy eirmod tempor invidunt ut labore et dolore magna aliquyam erat, sed diam voluptua.\n\n" * 20)
 
+        self.textbox_display = TextboxDisplay(self.textbox)
         self.update_textbox()
 
     def open_input_dialog_event(self):
@@ -90,8 +98,24 @@ class App(customtkinter.CTk):
         new_scaling_float = int(new_scaling.replace("%", "")) / 100
         customtkinter.set_widget_scaling(new_scaling_float)
 
+    def show_loading(self, text):
+        # Se puede llamar desde cualquier hilo; la interfaz se actualiza en el hilo principal
+        def show():
+            self.loading_label.configure(text=text)
+            self.loading_label.grid()
+            self.loading_bar.grid()
+            self.loading_bar.start()
+        self.after(0, show)
+
+    def hide_loading(self):
+        def hide():
+            self.loading_bar.stop()
+            self.loading_label.grid_remove()
+            self.loading_bar.grid_remove()
+        self.after(0, hide)
+
     def sidebar_button_event(self):
-        if self.screen_capture.running:
+        if self.screen_capture is not None and self.screen_capture.running:
             self.screen_capture.stop_capture()
         else:
             self.start_screen_capture()
@@ -102,28 +126,44 @@ class App(customtkinter.CTk):
         capture_thread.start()
 
     def run_screen_capture(self):
-        # Iniciar la captura y luego imprimir formatted_buffer periódicamente
+        # Cargar el motor OCR la primera vez que se usa y luego iniciar la captura
+        if self.screen_capture is None or self.screen_capture.reader is None:
+            self.show_loading("Loading OCR engine...")
+            try:
+                from screen_transcript import ScreenCapture
+                if self.screen_capture is None:
+                    self.screen_capture = ScreenCapture()
+                self.screen_capture.load_reader()
+            except Exception as e:
+                # Si la carga falla, se avisa al usuario y se puede volver a intentar con el mismo botón
+                self.after(0, lambda error=e: self.screen_capture_failed(error))
+                return
+            finally:
+                self.hide_loading()
         self.screen_capture.start_capture()
 
+    def screen_capture_failed(self, error):
+        tkinter.messagebox.showerror("Transcript", f"Could not start the screen transcript:\n{error}")
+
     def update_textbox(self):
-        # Verifica si formatted_buffer tiene contenido y lo inserta en el textbox
-        print(f"El formatted text: {self.screen_capture.formatted_buffer}")
-        if self.screen_capture.formatted_buffer.strip():
-            print(f"formatted_buffer (hilo principal): {self.screen_capture.formatted_buffer}")
-            self.textbox.delete("1.0", "end")
-            self.textbox.insert("1.0", self.screen_capture.formatted_buffer)
-        else:
-            print("formatted_buffer está vacío.")
-        
-        # Continuar llamando a esta función cada 2 segundos para actualizar el textbox
-        self.after(2000, self.update_textbox)
+        # Aplica solo los segmentos que cambiaron; el textbox se toca siempre desde el hilo principal
+        if self.screen_capture is not None:
+            for event in self.screen_capture.feed.drain():
+                self.textbox_display.apply(event)
+
+        # Revisar los cambios cada 50 ms; sin cambios no se hace ningún trabajo
+        self.after(50, self.update_textbox)
 
     def toggle_translation(self):
         if self.translator_running:
+            if self.translator is None:
+                # Todavía se está cargando; se puede detener en cuanto arranque
+                return
             self.translator_running = False
-            self.translator_thread.join()
-            self.sidebar_button_1.configure(text="Voice Translation", fg_color=None)
-        else:
+            self.translator.stop()
+            self.sidebar_button_1.configure(text="Stopping...", state="disabled")
+            self.wait_for_translation()
+        elif self.translator_thread is None or not self.translator_thread.is_alive():
             selected_language_index = self.radio_var.get()
             output_language = self.language_map.get(selected_language_index, "German")
             self.translator_running = True
@@ -131,9 +171,32 @@ class App(customtkinter.CTk):
             self.translator_thread.start()
             self.sidebar_button_1.configure(text="Stop Translation", fg_color="green")
 
+    def wait_for_translation(self):
+        # El hilo se revisa con after() para no bloquear la interfaz mientras termina
+        if self.translator_thread.is_alive():
+            self.after(100, self.wait_for_translation)
+            return
+        self.translator = None
+        self.sidebar_button_1.configure(text="Voice Translation", fg_color=None, state="normal")
+
     def start_translation(self, output_language):
-        translator = RealTimeTranslator(output_language=output_language)
-        translator.run()
+        # Whisper y TTS se importan y cargan solo cuando se usa la traducción de voz
+        self.show_loading("Loading voice translation...")
+        try:
+            from user_translation import RealTimeTranslator
+            self.translator = RealTimeTranslator(output_language=output_language)
+        except Exception as e:
+            # Si la carga falla, se avisa al usuario y el botón vuelve a su estado inicial
+            self.after(0, lambda error=e: self.translation_failed(error))
+            return
+        finally:
+            self.hide_loading()
+        self.translator.run()
+
+    def translation_failed(self, error):
+        self.translator_running = False
+        self.sidebar_button_1.configure(text="Voice Translation", fg_color=None)
+        tkinter.messagebox.showerror("Voice Translation", f"Could not start voice translation:\n{error}")
 
 
 if __name__ == "__main__":
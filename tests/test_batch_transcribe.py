@@ -0,0 +1,34 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "backend"))
+
+from batch_transcribe import find_recordings, write_transcript
+
+
+def touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "wb").close()
+
+
+def test_recordings_sharing_a_name_get_separate_transcripts(tmp_path):
+    recordings = tmp_path / "recordings"
+    for relative in ("a/meeting.wav", "b/meeting.wav", "meeting.wav", "meeting.mp3"):
+        touch(str(recordings / relative))
+    loose = tmp_path / "loose" / "meeting.wav"
+    touch(str(loose))
+
+    found = find_recordings([str(recordings), str(loose)])
+    names = [name for _, name in found]
+    assert len(found) == 5
+    assert len(set(names)) == 5
+
+    output_dir = tmp_path / "transcripts"
+    outputs = set()
+    for path, name in found:
+        result = {"path": path, "segments": [(0.0, 1.0, path)]}
+        outputs.add(write_transcript(result, None, str(output_dir), name))
+    assert len(outputs) == 5
+    for path, name in found:
+        with open(os.path.join(str(output_dir), name), encoding="utf-8") as f:
+            assert path in f.read()
@@ -0,0 +1,39 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "backend"))
+
+from decoding_state import LogMelCache, N_FFT, HOP_LENGTH, N_SAMPLES, WINDOW
+
+
+def reference_log_mel(audio, filters):
+    """
+    whisper.log_mel_spectrogram(whisper.pad_or_trim(audio)) in NumPy.
+    """
+    audio = np.pad(audio[:N_SAMPLES], (0, max(0, N_SAMPLES - len(audio))))
+    padded = np.pad(audio, N_FFT // 2, mode="reflect")
+    frames = np.lib.stride_tricks.sliding_window_view(padded, N_FFT)[::HOP_LENGTH]
+    power = (np.abs(np.fft.rfft(frames * WINDOW, axis=-1)) ** 2).T[:, :-1]
+    log_spec = np.log10(np.maximum(filters @ power, 1e-10))
+    log_spec = np.maximum(log_spec, log_spec.max() - 8.0)
+    return (log_spec + 4.0) / 4.0
+
+
+def test_log_mel_matches_whisper_while_the_window_grows():
+    rng = np.random.default_rng(0)
+    filters = rng.random((80, N_FFT // 2 + 1)).astype(np.float32)
+    audio = (rng.standard_normal(N_SAMPLES + 8000) * 0.1).astype(np.float32)
+    cache = LogMelCache(filters)
+    for size in (1000, 5123, 16000, 16480, 47999, N_SAMPLES - 37, N_SAMPLES, N_SAMPLES + 8000):
+        mel = cache.log_mel(audio[:size])
+        assert np.abs(mel - reference_log_mel(audio[:size], filters)).max() < 1e-3, size
+
+
+def test_log_mel_without_cache_matches_whisper():
+    rng = np.random.default_rng(1)
+    filters = rng.random((80, N_FFT // 2 + 1)).astype(np.float32)
+    audio = (rng.standard_normal(12345) * 0.1).astype(np.float32)
+    mel = LogMelCache(filters).log_mel(audio)
+    assert np.abs(mel - reference_log_mel(audio, filters)).max() < 1e-3